@@ -0,0 +1,139 @@
+"""
+Batching AI Manager
+
+This module provides a wrapper around AIManager that coalesces concurrent
+queries into batched AIManager.query_batch calls, so cache lookups and
+embeddings for many callers share a single round-trip.
+"""
+import asyncio
+from typing import List, Dict, Any, Optional, Tuple
+
+from backend.ai.manager import AIManager
+from backend.core import serialization
+
+class BatchingAIManager:
+    """Micro-batches concurrent AI queries through a background task"""
+    
+    def __init__(self, ai_manager: AIManager, max_batch: int = 32, max_wait_ms: float = 10.0):
+        """
+        Initialize the batching wrapper
+        
+        Args:
+            ai_manager: The AIManager that executes each batch
+            max_batch: Maximum number of queries sent in one batch
+            max_wait_ms: How long to wait for more queries after the first one arrives
+        """
+        self.ai_manager = ai_manager
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._dispatches = set()
+        
+    def __getattr__(self, name: str) -> Any:
+        # Anything not batched (analyze_note, generate_confirmation_request, ...) goes straight through
+        return getattr(self.ai_manager, name)
+        
+    @property
+    def running(self) -> bool:
+        """Whether the batching loop is active"""
+        return self._task is not None and not self._task.done()
+        
+    def start(self) -> None:
+        """Start the batching loop on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._server_loop())
+        
+    async def stop(self) -> None:
+        """Stop the batching loop and fail any queries still waiting"""
+        if self._task is None:
+            return
+            
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        
+        while not self._queue.empty():
+            *_, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("AI batching loop stopped"))
+                
+    async def query(self, prompt: str, context: Optional[List[Dict[str, Any]]] = None,
+                    prompt_type: str = "general", structured_output: bool = False,
+                    semantic: bool = True, cache_text: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Queue a query for the next batch and wait for its result
+        
+        Falls back to a direct AIManager.query call when the loop is not running.
+        
+        Args:
+            prompt: The user's prompt or question
+            context: Optional list of context items (notes, concepts, etc.)
+            prompt_type: Type of system prompt to use (general, analysis, confirmation)
+            structured_output: Whether to request structured JSON output
+            semantic: Whether a near-duplicate prompt's cached result may answer this one
+            cache_text: The varying part of a templated prompt, embedded for the semantic tier
+            
+        Returns:
+            Dictionary containing the AI response and metadata
+        """
+        if not self.running:
+            return await self.ai_manager.query(prompt, context, prompt_type, structured_output, semantic, cache_text)
+            
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((prompt, context, prompt_type, structured_output, semantic, cache_text, future))
+        return await future
+        
+    async def _server_loop(self) -> None:
+        """Drain the queue into batches and dispatch them"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                    
+            # Dispatch without blocking the next drain, holding a reference until it finishes
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+            
+    async def _dispatch(self, batch: List[Tuple]) -> None:
+        """Run one drained batch, grouping queries that share context and options"""
+        groups: Dict[Tuple[str, bool, bool, str], List[Tuple]] = {}
+        for item in batch:
+            _, context, prompt_type, structured_output, semantic, _, _ = item
+            key = (prompt_type, structured_output, semantic, serialization.dumps(context or []))
+            groups.setdefault(key, []).append(item)
+            
+        await asyncio.gather(*(self._run_group(items) for items in groups.values()))
+        
+    async def _run_group(self, items: List[Tuple]) -> None:
+        """Resolve the futures for queries that can share a single query_batch call"""
+        _, context, prompt_type, structured_output, semantic, _, _ = items[0]
+        # Prompts without a separate cache text are embedded whole
+        cache_texts = [item[5] if item[5] is not None else item[0] for item in items]
+        try:
+            results = await self.ai_manager.query_batch(
+                [item[0] for item in items], context, prompt_type, structured_output, semantic, cache_texts
+            )
+        except Exception as e:
+            for *_, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+            
+        for (*_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,247 @@
+"""
+AI Response Cache
+
+This module provides a two-tier cache for AI query results: an exact tier
+keyed by a hash of the full request, and a semantic tier that matches
+near-duplicate prompts by embedding similarity. The exact tier is backed
+by Redis when it is configured, so results are shared across workers.
+It also provides a decorator that memoizes per-content results, such as
+note extraction, by content hash.
+"""
+import functools
+import hashlib
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from backend.core import serialization
+from backend.core.redis_client import get_redis
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class AIResponseCache:
+    """In-memory LRU cache with TTL for AI query results"""
+    
+    def __init__(self,
+                 max_entries: int = 1024,
+                 ttl: float = 3600.0,
+                 semantic_threshold: Optional[float] = None,
+                 max_semantic_entries: int = 256,
+                 redis=None,
+                 key_prefix: str = "ai:response:"):
+        """
+        Initialize the cache
+        
+        Args:
+            max_entries: Maximum number of exact-match entries kept in memory
+            ttl: Seconds before an entry expires
+            semantic_threshold: Minimum cosine similarity for a semantic hit (None, the default, disables the tier)
+            max_semantic_entries: Maximum number of embeddings kept per namespace
+            redis: Optional redis.asyncio client for the exact tier (default: shared client, if configured)
+            key_prefix: Prefix for exact-tier keys stored in Redis
+        """
+        self.redis = redis if redis is not None else get_redis()
+        self.key_prefix = key_prefix
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.semantic_threshold = semantic_threshold
+        self.max_semantic_entries = max_semantic_entries
+        self._exact: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._semantic: Dict[str, Deque[Tuple[Sequence[float], float, Dict[str, Any]]]] = {}
+        
+    @property
+    def semantic_enabled(self) -> bool:
+        """Whether the semantic tier is active"""
+        return self.semantic_threshold is not None
+        
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Build a stable cache key from request components (truncated SHA-256, 128 bits)"""
+        return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()[:32]
+    
+    async def get_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get exact-tier results for several keys
+        
+        Keys missing from memory are fetched from Redis in a single pipelined
+        round-trip. Redis errors are treated as misses.
+        
+        Args:
+            keys: Exact cache keys
+            
+        Returns:
+            Cached result or None for each key, in order
+        """
+        results = [self.get_exact(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        if not misses or self.redis is None:
+            return results
+            
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for i in misses:
+                pipe.get(self.key_prefix + keys[i])
+            values = await pipe.execute()
+        except Exception:
+            return results
+            
+        for i, value in zip(misses, values):
+            if value is None:
+                continue
+            try:
+                results[i] = serialization.loads(value)
+            except serialization.JSONDecodeError:
+                continue
+            self.set_exact(keys[i], results[i])
+        return results
+    
+    async def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a result in the exact tier, in memory and in Redis if configured"""
+        self.set_exact(key, value)
+        if self.redis is None:
+            return
+            
+        try:
+            await self.redis.set(self.key_prefix + key, serialization.dumpb(value), ex=max(1, int(self.ttl)))
+        except Exception:
+            # Redis is a shared accelerator; the in-memory entry still serves this worker
+            pass
+        
+    def get_exact(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached result by exact key"""
+        entry = self._exact.get(key)
+        if entry is None:
+            return None
+            
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._exact[key]
+            return None
+            
+        self._exact.move_to_end(key)
+        return value
+        
+    def set_exact(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a result under an exact key"""
+        self._exact[key] = (time.monotonic() + self.ttl, value)
+        self._exact.move_to_end(key)
+        while len(self._exact) > self.max_entries:
+            self._exact.popitem(last=False)
+            
+    def get_semantic(self, namespace: str, embedding: Sequence[float]) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached result whose prompt embedding is most similar to the given one
+        
+        Args:
+            namespace: Key for everything except the prompt (model, prompt type, context)
+            embedding: Embedding of the prompt being looked up
+            
+        Returns:
+            The best matching result if its similarity clears the threshold
+        """
+        entries = self._semantic.get(namespace)
+        if not self.semantic_enabled or not entries:
+            return None
+            
+        now = time.monotonic()
+        while entries and entries[0][1] < now:
+            entries.popleft()
+            
+        query = self._normalize(embedding)
+        best_score, best_value = -1.0, None
+        for vector, expires_at, value in entries:
+            if expires_at < now:
+                continue
+            score = self._dot(query, vector)
+            if score > best_score:
+                best_score, best_value = score, value
+                
+        if best_score >= self.semantic_threshold:
+            return best_value
+        return None
+        
+    def set_semantic(self, namespace: str, embedding: Sequence[float], value: Dict[str, Any]) -> None:
+        """Store a result under a prompt embedding"""
+        if not self.semantic_enabled:
+            return
+        entries = self._semantic.get(namespace)
+        if entries is None:
+            entries = self._semantic[namespace] = deque(maxlen=self.max_semantic_entries)
+        entries.append((self._normalize(embedding), time.monotonic() + self.ttl, value))
+        
+    def clear(self) -> None:
+        """Remove all cached entries"""
+        self._exact.clear()
+        self._semantic.clear()
+        
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> Sequence[float]:
+        """Scale an embedding to unit length so cosine similarity is a dot product"""
+        if np is not None:
+            vector = np.asarray(embedding, dtype=np.float32)
+            norm = float(np.linalg.norm(vector))
+            return vector / norm if norm else vector
+            
+        norm = math.sqrt(sum(x * x for x in embedding))
+        return [x / norm for x in embedding] if norm else list(embedding)
+        
+    @staticmethod
+    def _dot(a: Sequence[float], b: Sequence[float]) -> float:
+        """Dot product of two unit vectors"""
+        if np is not None:
+            return float(np.dot(a, b))
+        return sum(x * y for x, y in zip(a, b))
+
+def content_cached(prefix: str, ttl: int = 7 * 24 * 3600, maxsize: int = 1024):
+    """
+    Memoize an async method of the form method(self, content) by content hash
+    
+    Results are kept in a small in-process LRU and, when Redis is configured,
+    under "<prefix>:<hash>" with a TTL so every worker shares them. Redis
+    errors fall through to calling the method.
+    
+    Args:
+        prefix: Redis key prefix for this cache
+        ttl: Seconds before a Redis entry expires
+        maxsize: Maximum number of results kept in process
+    """
+    def decorator(method: Callable[..., Awaitable[Dict[str, Any]]]):
+        local: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        
+        @functools.wraps(method)
+        async def wrapper(self, content: str) -> Dict[str, Any]:
+            key = hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+            if key in local:
+                local.move_to_end(key)
+                return local[key]
+                
+            redis = get_redis()
+            result = None
+            if redis is not None:
+                try:
+                    data = await redis.get(f"{prefix}:{key}")
+                    if data is not None:
+                        result = serialization.loads(data)
+                except Exception:
+                    result = None
+                    
+            if result is None:
+                result = await method(self, content)
+                if redis is not None:
+                    try:
+                        await redis.set(f"{prefix}:{key}", serialization.dumpb(result), ex=ttl)
+                    except Exception:
+                        pass
+                        
+            local[key] = result
+            while len(local) > maxsize:
+                local.popitem(last=False)
+            return result
+            
+        wrapper.cache_clear = local.clear
+        return wrapper
+    return decorator
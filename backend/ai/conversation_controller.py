@@ -4,11 +4,62 @@ Conversation Controller
 This module manages the conversational flow for AI interactions, implementing
 the confirmation-driven interaction model described in our strategy.
 """
-import json
-from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, Union, Callable, AsyncIterator
 from enum import Enum
 
 from backend.ai.manager import AIManager
+from backend.core import serialization
+
+# Invariant parts of the analysis prompt; only the history and user input vary per turn
+_ANALYSIS_PROMPT_HEAD = """
+You are an AI assistant that helps manage notes and related tasks in Noterer.
+
+Task: Analyze the user's request, determine necessary actions, and present a summary for confirmation.
+
+Conversation history:"""
+
+_ANALYSIS_PROMPT_TAIL = """
+Please follow these steps:
+
+1. Analyze the user's intent and determine required actions (note creation/modification, event scheduling, concept linking, etc.)
+
+2. For each action, determine:
+   - Specific changes to be made
+   - Philosophical implications and categorizations
+   - Impact on the existing knowledge graph
+
+3. Generate a clear summary of all proposed actions in user-friendly language
+
+4. Ask for user confirmation before proceeding
+
+Your response should include:
+1. A brief analysis of the user's request
+2. A clear summary of all proposed actions
+3. A request for confirmation
+
+For machine processing, include a JSON block with proposed actions in this format:
+```json
+{
+  "proposed_actions": [
+    {
+      "type": "create_note",
+      "content": "note content",
+      "concepts": ["concept1", "concept2"],
+      "categories": [{"name": "category", "confidence": 0.9}]
+    },
+    {
+      "type": "create_relationship",
+      "source": "source_id",
+      "target": "target_id",
+      "relationship_type": "RELATES_TO",
+      "properties": {"weight": 0.8}
+    }
+  ]
+}
+```
+"""
 
 class ConversationState(Enum):
     """States in the conversation flow"""
@@ -27,9 +78,18 @@ class ActionStatus(Enum):
     EXECUTED = "executed"
     FAILED = "failed"
 
+# Enum values used on hot paths, resolved once instead of through the enum descriptors
+_INITIAL = ConversationState.INITIAL.value
+_AWAITING_USER_INPUT = ConversationState.AWAITING_USER_INPUT.value
+_AWAITING_CONFIRMATION = ConversationState.AWAITING_CONFIRMATION.value
+_EXECUTED = ActionStatus.EXECUTED.value
+_FAILED = ActionStatus.FAILED.value
+
 class ConversationTurn:
     """Represents a single turn in the conversation"""
     
+    __slots__ = ("user_input", "ai_response", "proposed_actions", "confirmed", "executed_actions", "timestamp")
+    
     def __init__(self, 
                  user_input: Optional[str] = None,
                  ai_response: Optional[str] = None,
@@ -80,6 +140,8 @@ class ConversationTurn:
 class Conversation:
     """Manages the entire conversation context and history"""
     
+    __slots__ = ("conversation_id", "turns", "state", "current_turn", "metadata", "_context_cache")
+    
     def __init__(self, conversation_id: Optional[str] = None):
         """
         Initialize a conversation
@@ -92,6 +154,7 @@ class Conversation:
         self.state = ConversationState.INITIAL
         self.current_turn: Optional[ConversationTurn] = None
         self.metadata: Dict[str, Any] = {}
+        self._context_cache: Optional[Tuple[tuple, str]] = None
         
     def start_new_turn(self, user_input: str) -> ConversationTurn:
         """
@@ -173,28 +236,49 @@ class Conversation:
         Returns:
             Formatted conversation history
         """
+        # Completed turns are never modified, so the history only changes when
+        # a turn is added or the current turn changes
+        current_input = self.current_turn.user_input if self.current_turn else None
+        cache_key = (max_turns, len(self.turns), id(self.current_turn), current_input)
+        if self._context_cache is not None and self._context_cache[0] == cache_key:
+            return self._context_cache[1]
+        
         # Get recent turns
         recent_turns = self.turns[-max_turns:] if len(self.turns) > 0 else []
         
         # Format conversation history
-        history = ""
+        parts = []
         for i, turn in enumerate(recent_turns):
-            history += f"Turn {i+1}:\n"
-            history += f"User: {turn.user_input}\n"
-            if turn.ai_response:
-                history += f"AI: {turn.ai_response}\n"
-            if turn.confirmed:
-                history += "User confirmed actions.\n"
-            else:
-                history += "User rejected actions.\n"
-            history += "\n"
+            ai_line = f"AI: {turn.ai_response}\n" if turn.ai_response else ""
+            confirmation = "User confirmed actions." if turn.confirmed else "User rejected actions."
+            parts.append(f"Turn {i+1}:\nUser: {turn.user_input}\n{ai_line}{confirmation}\n\n")
             
         # Add current turn if exists
-        if self.current_turn and self.current_turn.user_input:
-            history += f"Current Turn:\nUser: {self.current_turn.user_input}\n"
+        if current_input:
+            parts.append(f"Current Turn:\nUser: {current_input}\n")
             
+        history = "".join(parts)
+        self._context_cache = (cache_key, history)
         return history
     
+    def get_messages_for_ai(self, max_turns: int = 5) -> List[Dict[str, str]]:
+        """
+        Get recent conversation history as chat messages for the AI
+        
+        Args:
+            max_turns: Maximum number of past turns to include
+            
+        Returns:
+            List of message dictionaries with role and content
+        """
+        messages = []
+        for turn in self.turns[-max_turns:]:
+            if turn.user_input:
+                messages.append({"role": "user", "content": turn.user_input})
+            if turn.ai_response:
+                messages.append({"role": "assistant", "content": turn.ai_response})
+        return messages
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert conversation to dictionary representation"""
         return {
@@ -205,30 +289,68 @@ class Conversation:
             "metadata": self.metadata
         }
         
+    def to_json(self) -> bytes:
+        """
+        Serialize the conversation to JSON bytes
+        
+        Produces the same document as to_dict, but builds the turn records
+        inline for the encoder rather than through ConversationTurn.to_dict.
+        """
+        turns = [
+            {
+                "user_input": turn.user_input,
+                "ai_response": turn.ai_response,
+                "proposed_actions": turn.proposed_actions,
+                "confirmed": turn.confirmed,
+                "executed_actions": turn.executed_actions,
+                "timestamp": turn.timestamp
+            }
+            for turn in self.turns
+        ]
+        return serialization.dumpb({
+            "conversation_id": self.conversation_id,
+            "state": self.state.value,
+            "turns": turns,
+            "current_turn": self.current_turn.to_dict() if self.current_turn else None,
+            "metadata": self.metadata
+        })
+        
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Conversation':
         """Create conversation from dictionary representation"""
         conversation = cls(conversation_id=data.get("conversation_id"))
-        conversation.state = ConversationState(data.get("state", ConversationState.INITIAL.value))
+        conversation.state = ConversationState(data.get("state", _INITIAL))
         conversation.turns = [ConversationTurn.from_dict(turn) for turn in data.get("turns", [])]
         conversation.current_turn = ConversationTurn.from_dict(data["current_turn"]) if data.get("current_turn") else None
         conversation.metadata = data.get("metadata", {})
         return conversation
+        
+    @classmethod
+    def from_json(cls, data: Union[str, bytes]) -> 'Conversation':
+        """Create conversation from a JSON document"""
+        return cls.from_dict(serialization.loads(data))
 
 class ConversationalFlowController:
     """
     Controls the conversation flow using the confirmation-driven interaction model
     """
     
-    def __init__(self, ai_manager: AIManager):
+    def __init__(self, ai_manager: AIManager,
+                 max_active_conversations: int = 1000,
+                 on_evict: Optional[Callable[[Conversation], None]] = None):
         """
         Initialize the conversational flow controller
         
         Args:
             ai_manager: Instance of AIManager for AI interactions
+            max_active_conversations: Maximum number of conversations kept in memory
+            on_evict: Optional callback receiving conversations evicted from memory,
+                e.g. to persist them via to_dict()
         """
         self.ai_manager = ai_manager
-        self.active_conversations: Dict[str, Conversation] = {}
+        self.active_conversations: OrderedDict[str, Conversation] = OrderedDict()
+        self.max_active_conversations = max_active_conversations
+        self.on_evict = on_evict
         
     def get_or_create_conversation(self, conversation_id: Optional[str] = None) -> Conversation:
         """
@@ -241,6 +363,8 @@ class ConversationalFlowController:
             Conversation instance
         """
         if conversation_id and conversation_id in self.active_conversations:
+            # Mark as most recently used
+            self.active_conversations.move_to_end(conversation_id)
             return self.active_conversations[conversation_id]
             
         # Create a new conversation
@@ -248,6 +372,12 @@ class ConversationalFlowController:
         if conversation_id:
             self.active_conversations[conversation_id] = conversation
             
+            # Evict the least recently used conversations beyond the cap
+            while len(self.active_conversations) > self.max_active_conversations:
+                _, evicted = self.active_conversations.popitem(last=False)
+                if self.on_evict:
+                    self.on_evict(evicted)
+            
         return conversation
     
     async def process_user_input(self, 
@@ -265,6 +395,48 @@ class ConversationalFlowController:
         Returns:
             Dictionary with AI response and proposed actions
         """
+        prompt, merged_context = self._prepare_turn(conversation, user_input, context)
+        
+        # Query the AI. A similar request's proposed actions must never stand
+        # in for this one's, so only exact repeats are served from the cache
+        result = await self.ai_manager.query(prompt, merged_context, semantic=False)
+        
+        return self._complete_turn(conversation, result["response"])
+    
+    async def process_user_input_stream(self,
+                                        conversation: Conversation,
+                                        user_input: str,
+                                        context: Optional[List[Dict[str, Any]]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process user input, yielding the AI response as it is generated
+        
+        Args:
+            conversation: The conversation instance
+            user_input: The user's input text
+            context: Optional additional context (notes, concepts, etc.)
+            
+        Yields:
+            {"type": "delta", "content": ...} events for each chunk of response text,
+            followed by one {"type": "result", ...} event carrying the same fields
+            as process_user_input
+        """
+        prompt, merged_context = self._prepare_turn(conversation, user_input, context)
+        
+        chunks = []
+        try:
+            async for delta in self.ai_manager.query_stream(prompt, merged_context):
+                chunks.append(delta)
+                yield {"type": "delta", "content": delta}
+            response = "".join(chunks)
+        except Exception as e:
+            response = f"An error occurred: {str(e)}"
+            
+        # Actions are only extracted once the full response is available
+        yield {"type": "result", **self._complete_turn(conversation, response)}
+    
+    def _prepare_turn(self, conversation: Conversation, user_input: str,
+                      context: Optional[List[Dict[str, Any]]]) -> Tuple[str, List[Dict[str, Any]]]:
+        """Start a turn and build the analysis prompt and merged context for it"""
         # Start a new turn with user input
         conversation.start_new_turn(user_input)
         
@@ -274,19 +446,21 @@ class ConversationalFlowController:
         # Create the analysis prompt
         prompt = self._create_analysis_prompt(user_input, conversation_history)
         
-        # Merge additional context
+        # Merge additional context, passing past turns as structured messages
         merged_context = context or []
-        if conversation_history:
+        conversation_messages = conversation.get_messages_for_ai()
+        if conversation_messages:
             merged_context.append({
-                "type": "conversation_history",
-                "content": conversation_history
+                "type": "conversation_messages",
+                "content": conversation_messages
             })
-        
-        # Query the AI
-        result = await self.ai_manager.query(prompt, merged_context)
-        
+            
+        return prompt, merged_context
+    
+    def _complete_turn(self, conversation: Conversation, response: str) -> Dict[str, Any]:
+        """Record the AI response and proposed actions on the current turn"""
         # Extract proposed actions from the response
-        response_text, proposed_actions = self._extract_actions_from_response(result["response"])
+        response_text, proposed_actions = self._extract_actions_from_response(response)
         
         # Update the conversation with the AI response and proposed actions
         conversation.set_proposed_actions(response_text, proposed_actions)
@@ -295,13 +469,14 @@ class ConversationalFlowController:
             "response": response_text,
             "proposed_actions": proposed_actions,
             "requires_confirmation": len(proposed_actions) > 0,
-            "conversation_state": conversation.state.value
+            "conversation_state": _AWAITING_CONFIRMATION
         }
     
     async def process_confirmation(self,
                                  conversation: Conversation,
                                  confirmed: bool,
-                                 action_handlers: Optional[Dict[str, callable]] = None) -> Dict[str, Any]:
+                                 action_handlers: Optional[Dict[str, callable]] = None,
+                                 parallel: bool = False) -> Dict[str, Any]:
         """
         Process user confirmation and execute actions if confirmed
         
@@ -309,6 +484,8 @@ class ConversationalFlowController:
             conversation: The conversation instance
             confirmed: Whether the user confirmed the proposed actions
             action_handlers: Dictionary of handler functions for different action types
+            parallel: Run the action handlers concurrently; only safe when no action
+                depends on the side effects of another in the same turn
             
         Returns:
             Dictionary with results of confirmation processing
@@ -316,37 +493,26 @@ class ConversationalFlowController:
         # Update the conversation with confirmation status
         conversation.set_confirmation(confirmed)
         
-        # If not confirmed, return early
+        # If not confirmed, return early (a rejection always leaves the
+        # conversation awaiting user input)
         if not confirmed:
             return {
                 "confirmed": False,
                 "executed_actions": [],
                 "response": "Actions cancelled as requested.",
-                "conversation_state": conversation.state.value
+                "conversation_state": _AWAITING_USER_INPUT
             }
         
         # If confirmed, execute the actions
-        executed_actions = []
-        errors = []
-        
-        if conversation.current_turn and conversation.current_turn.proposed_actions:
-            for action in conversation.current_turn.proposed_actions:
-                try:
-                    # Execute the action using the appropriate handler
-                    action_type = action.get("type", "unknown")
-                    if action_handlers and action_type in action_handlers:
-                        result = await action_handlers[action_type](action)
-                        executed_action = {**action, "status": ActionStatus.EXECUTED.value, "result": result}
-                    else:
-                        # No handler available
-                        executed_action = {**action, "status": ActionStatus.FAILED.value, "error": "No handler available"}
-                        errors.append(f"No handler available for action type: {action_type}")
-                except Exception as e:
-                    # Handle execution errors
-                    executed_action = {**action, "status": ActionStatus.FAILED.value, "error": str(e)}
-                    errors.append(f"Error executing {action.get('type', 'unknown')} action: {str(e)}")
-                
-                executed_actions.append(executed_action)
+        actions = conversation.current_turn.proposed_actions if conversation.current_turn else ()
+        handlers = action_handlers or {}
+        if parallel:
+            outcomes = await asyncio.gather(*(self._execute_action(action, handlers) for action in actions))
+        else:
+            outcomes = [await self._execute_action(action, handlers) for action in actions]
+            
+        executed_actions = [executed_action for executed_action, _ in outcomes]
+        errors = [error for _, error in outcomes if error]
         
         # Update the conversation with executed actions
         conversation.set_executed_actions(executed_actions)
@@ -361,61 +527,40 @@ class ConversationalFlowController:
             "confirmed": True,
             "executed_actions": executed_actions,
             "response": response,
-            "conversation_state": conversation.state.value
+            "conversation_state": _AWAITING_USER_INPUT
         }
     
+    async def _execute_action(self, action: Dict[str, Any],
+                              handlers: Dict[str, callable]) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Execute a single proposed action
+        
+        Args:
+            action: The proposed action
+            handlers: Dictionary of handler functions for different action types
+            
+        Returns:
+            Tuple of (executed action record, error message or None)
+        """
+        action_type = action.get("type", "unknown")
+        handler = handlers.get(action_type)
+        try:
+            # Execute the action using the appropriate handler
+            if handler:
+                result = await handler(action)
+                return dict(action, status=_EXECUTED, result=result), None
+                
+            # No handler available
+            return (dict(action, status=_FAILED, error="No handler available"),
+                    f"No handler available for action type: {action_type}")
+        except Exception as e:
+            # Handle execution errors
+            return (dict(action, status=_FAILED, error=str(e)),
+                    f"Error executing {action_type} action: {str(e)}")
+    
     def _create_analysis_prompt(self, user_input: str, conversation_history: str) -> str:
         """Create a prompt for analyzing user input and generating proposed actions"""
-        return f"""
-        You are an AI assistant that helps manage notes and related tasks in Noterer.
-
-        Task: Analyze the user's request, determine necessary actions, and present a summary for confirmation.
-
-        Conversation history:
-        {conversation_history}
-
-        Current user input:
-        {user_input}
-
-        Please follow these steps:
-
-        1. Analyze the user's intent and determine required actions (note creation/modification, event scheduling, concept linking, etc.)
-
-        2. For each action, determine:
-           - Specific changes to be made
-           - Philosophical implications and categorizations
-           - Impact on the existing knowledge graph
-
-        3. Generate a clear summary of all proposed actions in user-friendly language
-
-        4. Ask for user confirmation before proceeding
-
-        Your response should include:
-        1. A brief analysis of the user's request
-        2. A clear summary of all proposed actions
-        3. A request for confirmation
-
-        For machine processing, include a JSON block with proposed actions in this format:
-        ```json
-        {
-          "proposed_actions": [
-            {
-              "type": "create_note",
-              "content": "note content",
-              "concepts": ["concept1", "concept2"],
-              "categories": [{"name": "category", "confidence": 0.9}]
-            },
-            {
-              "type": "create_relationship",
-              "source": "source_id",
-              "target": "target_id",
-              "relationship_type": "RELATES_TO",
-              "properties": {"weight": 0.8}
-            }
-          ]
-        }
-        ```
-        """
+        return f"{_ANALYSIS_PROMPT_HEAD}\n{conversation_history}\n\nCurrent user input:\n{user_input}\n{_ANALYSIS_PROMPT_TAIL}"
     
     def _extract_actions_from_response(self, response: str) -> Tuple[str, List[Dict[str, Any]]]:
         """
@@ -427,26 +572,23 @@ class ConversationalFlowController:
         Returns:
             Tuple of (user-friendly response text, list of proposed actions)
         """
-        # Default empty actions list
-        proposed_actions = []
-        
-        # Look for JSON block in the response
+        # Split around the JSON block within markdown code blocks
+        head, fence, rest = response.partition("```json")
+        if not fence:
+            return response, []
+        json_str, fence, tail = rest.partition("```")
+        if not fence:
+            return response, []
+            
         try:
-            # Find JSON block within markdown code blocks
-            json_start = response.find("```json")
-            if json_start != -1:
-                json_end = response.find("```", json_start + 6)
-                if json_end != -1:
-                    json_str = response[json_start + 7:json_end].strip()
-                    action_data = json.loads(json_str)
-                    if "proposed_actions" in action_data:
-                        proposed_actions = action_data["proposed_actions"]
-                        
-                    # Remove the JSON block from the response for user-friendly output
-                    user_response = response[:json_start] + response[json_end + 3:]
-                    return user_response.strip(), proposed_actions
-        except Exception:
-            # If extraction fails, return the original response
-            pass
+            action_data = serialization.loads(json_str)
+        except serialization.JSONDecodeError:
+            # If the block is malformed, return the original response
+            return response, []
+            
+        proposed_actions = []
+        if isinstance(action_data, dict):
+            proposed_actions = action_data.get("proposed_actions", [])
             
-        return response, proposed_actions
+        # Remove the JSON block from the response for user-friendly output
+        return (head + tail).strip(), proposed_actions
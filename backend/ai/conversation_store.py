@@ -0,0 +1,149 @@
+"""
+Conversation Store
+
+This module provides storage for active conversations. Conversations are
+kept in Redis when it is configured, so any API worker can serve any
+conversation, with a bounded in-process fallback for single-worker setups.
+Idle conversations are expired by a periodic sweep of a last-activity index.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from backend.ai.conversation_controller import Conversation
+from backend.core.redis_client import get_redis
+
+class ConversationStore:
+    """Stores active conversations, indexed by last activity"""
+    
+    def __init__(self, redis=None, key_prefix: str = "conv:", idle_ttl: float = 3600.0,
+                 max_local: int = 10_000):
+        """
+        Initialize the store
+        
+        Args:
+            redis: Optional redis.asyncio client (default: shared client, if configured)
+            key_prefix: Prefix for conversation keys and the activity index
+            idle_ttl: Seconds of inactivity before a conversation is expired
+            max_local: Maximum number of conversations kept in process without Redis;
+                the least recently used are evicted first
+        """
+        self.redis = redis if redis is not None else get_redis()
+        self.key_prefix = key_prefix
+        self.index_key = f"{key_prefix}index"
+        self.idle_ttl = idle_ttl
+        self.max_local = max_local
+        # Least recently active first: conversation_id -> (last_active, conversation)
+        self._local: "OrderedDict[str, Tuple[float, Conversation]]" = OrderedDict()
+        
+    def _key(self, conversation_id: str) -> str:
+        return f"{self.key_prefix}{conversation_id}"
+        
+    async def get(self, conversation_id: str) -> Optional[Conversation]:
+        """
+        Get a conversation and mark it as active
+        
+        Args:
+            conversation_id: ID of the conversation
+            
+        Returns:
+            The conversation, or None if it does not exist
+        """
+        now = time.time()
+        if self.redis is None:
+            entry = self._local.get(conversation_id)
+            if entry is None:
+                return None
+            if entry[0] < now - self.idle_ttl:
+                del self._local[conversation_id]
+                return None
+            self._local[conversation_id] = (now, entry[1])
+            self._local.move_to_end(conversation_id)
+            return entry[1]
+            
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(self._key(conversation_id))
+        pipe.zadd(self.index_key, {conversation_id: now}, xx=True)
+        data, _ = await pipe.execute()
+        return Conversation.from_json(data) if data is not None else None
+        
+    async def set(self, conversation: Conversation) -> None:
+        """Store a conversation and mark it as active"""
+        conversation_id = conversation.conversation_id
+        now = time.time()
+        if self.redis is None:
+            self._local[conversation_id] = (now, conversation)
+            self._local.move_to_end(conversation_id)
+            while len(self._local) > self.max_local:
+                self._local.popitem(last=False)
+            return
+            
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.set(self._key(conversation_id), conversation.to_json())
+        pipe.zadd(self.index_key, {conversation_id: now})
+        await pipe.execute()
+        
+    async def delete(self, conversation_id: str) -> bool:
+        """
+        Remove a conversation
+        
+        Args:
+            conversation_id: ID of the conversation
+            
+        Returns:
+            True if the conversation existed
+        """
+        if self.redis is None:
+            return self._local.pop(conversation_id, None) is not None
+            
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.delete(self._key(conversation_id))
+        pipe.zrem(self.index_key, conversation_id)
+        deleted, _ = await pipe.execute()
+        return bool(deleted)
+        
+    async def expire_idle(self, batch_size: int = 500) -> int:
+        """
+        Remove conversations that have been idle longer than idle_ttl
+        
+        Args:
+            batch_size: Maximum number of conversations removed per call
+            
+        Returns:
+            Number of conversations removed
+        """
+        cutoff = time.time() - self.idle_ttl
+        if self.redis is None:
+            # Entries are ordered by last activity, so the idle ones are at the front
+            expired = 0
+            while self._local and expired < batch_size:
+                conversation_id, (last_active, _) = next(iter(self._local.items()))
+                if last_active >= cutoff:
+                    break
+                del self._local[conversation_id]
+                expired += 1
+            return expired
+            
+        expired: List[bytes] = await self.redis.zrangebyscore(
+            self.index_key, "-inf", cutoff, start=0, num=batch_size
+        )
+        if not expired:
+            return 0
+            
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.delete(*(self._key(cid.decode()) for cid in expired))
+        pipe.zrem(self.index_key, *expired)
+        await pipe.execute()
+        return len(expired)
+        
+    async def run_sweeper(self, interval: float = 60.0) -> None:
+        """Expire idle conversations every interval seconds until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                while await self.expire_idle() > 0:
+                    pass
+            except Exception:
+                # A failed sweep is retried on the next interval
+                continue
@@ -4,26 +4,70 @@ AI Manager
 This module manages interactions with the AI system, including prompt construction,
 response processing, and integration with the graph database.
 """
+import asyncio
 import os
-import json
-from openai import OpenAI
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
+
+from backend.ai.cache import AIResponseCache
+from backend.core import serialization
+
+# Context item types that are sent as chat messages rather than prompt text
+_HISTORY_CONTEXT_TYPES = ("conversation_history", "conversation_messages")
 
 class AIManager:
     """Manager for AI interactions"""
     
-    def __init__(self, model_name: str = "gpt-4o"):
-        """Initialize the AI manager with API key and model configuration"""
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, model_name: str = "gpt-4o", cache: Optional[AIResponseCache] = None,
+                 embedding_model: str = "text-embedding-3-small"):
+        """
+        Initialize the AI manager with API key and model configuration
+        
+        Args:
+            model_name: Chat completion model to use
+            cache: Optional response cache (a default in-memory cache is created if omitted)
+            embedding_model: Model used to embed prompts for the semantic cache tier
+        """
+        self._api_key = os.getenv("OPENAI_API_KEY")
+        self._client = None
         self.model_name = model_name
+        self.cache = cache if cache is not None else AIResponseCache()
+        self.embedding_model = embedding_model
         self.system_prompts = {
             "general": "You are an intelligent assistant for the Noterer application. You help with note-taking, concept extraction, and philosophical organization.",
             "analysis": "You are an analytical assistant for the Noterer application. Extract concepts, categorize content philosophically, and identify relationships between ideas.",
             "confirmation": "You are a helpful assistant for the Noterer application. Your task is to clearly explain proposed changes and ask for user confirmation before proceeding."
         }
+        # System messages are shared by every query; the messages list is copied, never these dicts
+        self._system_messages = {
+            name: {"role": "system", "content": text} for name, text in self.system_prompts.items()
+        }
+    
+    @property
+    def client(self):
+        """The OpenAI client, created on first use"""
+        if self._client is None:
+            # Imported here so constructing an AIManager stays cheap when it is never queried
+            import httpx
+            from openai import AsyncOpenAI
+            # One pooled HTTP client for the lifetime of the manager, so keep-alive
+            # connections are reused across queries
+            self._client = AsyncOpenAI(
+                api_key=self._api_key,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+                )
+            )
+        return self._client
+    
+    async def close(self) -> None:
+        """Close the OpenAI client and its connection pool if one was created"""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
     
     async def query(self, prompt: str, context: Optional[List[Dict[str, Any]]] = None, 
-                prompt_type: str = "general", structured_output: bool = False) -> Dict[str, Any]:
+                prompt_type: str = "general", structured_output: bool = False,
+                semantic: bool = True, cache_text: Optional[str] = None) -> Dict[str, Any]:
         """
         Query the AI with a prompt and optional context
         
@@ -32,89 +76,97 @@ class AIManager:
             context: Optional list of context items (notes, concepts, etc.)
             prompt_type: Type of system prompt to use (general, analysis, confirmation)
             structured_output: Whether to request structured JSON output
+            semantic: Whether a near-duplicate prompt's cached result may answer this one
+            cache_text: The varying part of a templated prompt, embedded for the semantic tier
             
         Returns:
             Dictionary containing the AI response and metadata
         """
-        # Construct the full prompt with context if provided
-        full_prompt = self._build_prompt(prompt, context, structured_output)
+        results = await self.query_batch(
+            [prompt], context, prompt_type, structured_output, semantic,
+            [cache_text] if cache_text is not None else None
+        )
+        return results[0]
+    
+    async def query_batch(self, prompts: List[str], context: Optional[List[Dict[str, Any]]] = None,
+                          prompt_type: str = "general", structured_output: bool = False,
+                          semantic: bool = True, cache_texts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Query the AI with several prompts that share a context
         
-        try:
-            # Get the appropriate system prompt
-            system_prompt = self.system_prompts.get(prompt_type, self.system_prompts["general"])
-            
-            # Construct messages array
-            messages = [
-                {"role": "system", "content": system_prompt}
-            ]
-            
-            # Add conversation history messages if present in context
-            if context:
-                for item in context:
-                    if item.get("type") == "conversation_history":
-                        # Parse conversation history into separate messages
-                        history_lines = item["content"].strip().split('\n')
-                        current_role = None
-                        current_content = []
-                        
-                        for line in history_lines:
-                            if line.startswith("User: "):
-                                # Add previous message if exists
-                                if current_role and current_content:
-                                    messages.append({
-                                        "role": current_role,
-                                        "content": "\n".join(current_content)
-                                    })
-                                # Start new user message
-                                current_role = "user"
-                                current_content = [line[6:]]
-                            elif line.startswith("AI: "):
-                                # Add previous message if exists
-                                if current_role and current_content:
-                                    messages.append({
-                                        "role": current_role,
-                                        "content": "\n".join(current_content)
-                                    })
-                                # Start new assistant message
-                                current_role = "assistant"
-                                current_content = [line[4:]]
-                            elif current_content:
-                                # Continue current message
-                                current_content.append(line)
-                        
-                        # Add final message if exists
-                        if current_role and current_content:
-                            messages.append({
-                                "role": current_role,
-                                "content": "\n".join(current_content)
-                            })
+        Exact cache lookups for the whole batch go out in one round-trip, and
+        only the prompts that miss are embedded, in a single embeddings call.
+        The remaining misses are sent to the API concurrently.
+        
+        Structured output is never served from the semantic tier: a similar
+        prompt's extracted data or proposed actions would be applied as if
+        they were this prompt's.
+        
+        Args:
+            prompts: The prompts to answer
+            context: Optional list of context items shared by all prompts
+            prompt_type: Type of system prompt to use (general, analysis, confirmation)
+            structured_output: Whether to request structured JSON output
+            semantic: Whether near-duplicate prompts' cached results may answer these
+            cache_texts: The varying part of each prompt, embedded for the semantic
+                tier instead of the whole prompt (which may be mostly template)
             
-            # Add the current prompt as a user message
-            messages.append({"role": "user", "content": full_prompt})
+        Returns:
+            One result dictionary per prompt, in order
+        """
+        # Everything except the prompt text scopes the cache entry
+        namespace = self._cache_namespace(context, prompt_type, structured_output)
+        keys = [AIResponseCache.make_key(namespace, prompt) for prompt in prompts]
+        results = await self.cache.get_many(keys)
+        
+        misses = [i for i, result in enumerate(results) if result is None]
+        if semantic and not structured_output:
+            embed_texts = cache_texts if cache_texts is not None else prompts
+            embeddings = await self._embed_many([embed_texts[i] for i in misses])
+        else:
+            embeddings = [None] * len(misses)
+        
+        pending = []
+        for i, embedding in zip(misses, embeddings):
+            if embedding is not None:
+                results[i] = self.cache.get_semantic(namespace, embedding)
+            if results[i] is None:
+                pending.append((i, embedding))
+                
+        completed = await asyncio.gather(*(
+            self._complete(prompts[i], context, prompt_type, structured_output) for i, _ in pending
+        ))
+        
+        for (i, embedding), result in zip(pending, completed):
+            results[i] = result
+            if "error" in result:
+                continue
+            # Populate both cache tiers
+            await self.cache.put(keys[i], result)
+            if embedding is not None:
+                self.cache.set_semantic(namespace, embedding, result)
+                
+        return [dict(result) for result in results]
+    
+    async def _complete(self, prompt: str, context: Optional[List[Dict[str, Any]]],
+                        prompt_type: str, structured_output: bool) -> Dict[str, Any]:
+        """Send a single uncached query to the API and build its result"""
+        try:
+            # Construct the full prompt with context if provided
+            full_prompt = self._build_prompt(prompt, context, structured_output)
+            messages = self._build_messages(full_prompt, context, prompt_type)
             
             # Call the OpenAI API
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model_name,
                 messages=messages,
                 response_format={"type": "json_object"} if structured_output else {"type": "text"}
             )
             
             # Process and return the response
-            result = {
-                "response": response.choices[0].message.content,
-                "source_notes": self._extract_sources(response.choices[0].message.content, context),
-                "concepts_referenced": self._extract_concepts(response.choices[0].message.content)
-            }
-            
-            # Parse structured output if requested
-            if structured_output:
-                try:
-                    result["structured_data"] = json.loads(response.choices[0].message.content)
-                except json.JSONDecodeError:
-                    result["structured_data"] = None
-                    result["parse_error"] = "Failed to parse JSON response"
-            
-            return result
+            return self._build_result(
+                response.choices[0].message.content, self._note_context(context), structured_output
+            )
             
         except Exception as e:
             # Handle API errors
@@ -123,6 +175,159 @@ class AIManager:
                 "response": f"An error occurred: {str(e)}"
             }
     
+    async def query_stream(self, prompt: str, context: Optional[List[Dict[str, Any]]] = None,
+                           prompt_type: str = "general", structured_output: bool = False) -> AsyncIterator[str]:
+        """
+        Query the AI and yield the response text as it is generated
+        
+        Only the exact cache tier is consulted, since the semantic tier would
+        need an embedding round-trip before the first token. API errors are
+        raised to the caller.
+        
+        Args:
+            prompt: The user's prompt or question
+            context: Optional list of context items (notes, concepts, etc.)
+            prompt_type: Type of system prompt to use (general, analysis, confirmation)
+            structured_output: Whether to request structured JSON output
+            
+        Yields:
+            Chunks of the AI response text
+        """
+        full_prompt = self._build_prompt(prompt, context, structured_output)
+        
+        namespace = self._cache_namespace(context, prompt_type, structured_output)
+        exact_key = AIResponseCache.make_key(namespace, prompt)
+        cached = (await self.cache.get_many([exact_key]))[0]
+        if cached is not None:
+            yield cached["response"]
+            return
+            
+        messages = self._build_messages(full_prompt, context, prompt_type)
+        stream = await self.client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            response_format={"type": "json_object"} if structured_output else {"type": "text"},
+            stream=True
+        )
+        
+        chunks = []
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                chunks.append(delta)
+                yield delta
+                
+        result = self._build_result("".join(chunks), self._note_context(context), structured_output)
+        await self.cache.put(exact_key, result)
+    
+    def build_result(self, content: str, context: Optional[List[Dict[str, Any]]] = None,
+                     structured_output: bool = False) -> Dict[str, Any]:
+        """
+        Build the result dictionary (sources, concepts, structured data) for response text
+        
+        Used by callers of query_stream to get the metadata query would have returned.
+        """
+        return self._build_result(content, self._note_context(context), structured_output)
+    
+    def _cache_namespace(self, context: Optional[List[Dict[str, Any]]],
+                         prompt_type: str, structured_output: bool) -> str:
+        """Get the cache namespace covering everything about a query except the prompt"""
+        return AIResponseCache.make_key(
+            self.model_name, prompt_type, str(structured_output), serialization.dumps(context or [])
+        )
+    
+    def _build_messages(self, full_prompt: str, context: Optional[List[Dict[str, Any]]],
+                        prompt_type: str) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for a query
+        
+        Args:
+            full_prompt: The prompt including any context section
+            context: Optional list of context items, possibly carrying conversation history
+            prompt_type: Type of system prompt to use
+            
+        Returns:
+            List of message dictionaries ending with the user prompt
+        """
+        # Construct messages array starting with the appropriate system prompt
+        messages = [self._system_messages.get(prompt_type, self._system_messages["general"])]
+        
+        # Add conversation history messages if present in context
+        if context:
+            for item in context:
+                if item.get("type") == "conversation_messages":
+                    # Structured history is already in chat message form
+                    messages.extend(item["content"])
+                elif item.get("type") == "conversation_history":
+                    # Parse conversation history into separate messages
+                    current_role = None
+                    current_content = []
+                    
+                    for line in item["content"].strip().splitlines():
+                        prefix = line[:6]
+                        if prefix == "User: ":
+                            role, text = "user", line[6:]
+                        elif prefix[:4] == "AI: ":
+                            role, text = "assistant", line[4:]
+                        else:
+                            if current_content:
+                                # Continue current message
+                                current_content.append(line)
+                            continue
+                            
+                        # Add previous message if exists, then start the new one
+                        if current_role and current_content:
+                            messages.append({
+                                "role": current_role,
+                                "content": "\n".join(current_content)
+                            })
+                        current_role = role
+                        current_content = [text]
+                    
+                    # Add final message if exists
+                    if current_role and current_content:
+                        messages.append({
+                            "role": current_role,
+                            "content": "\n".join(current_content)
+                        })
+        
+        # Add the current prompt as a user message
+        messages.append({"role": "user", "content": full_prompt})
+        return messages
+    
+    def _build_result(self, content: str, note_context: List[Dict[str, Any]],
+                      structured_output: bool) -> Dict[str, Any]:
+        """Build the query result dictionary from the response text"""
+        result = {
+            "response": content,
+            "source_notes": self._extract_sources(content, note_context),
+            "concepts_referenced": self._extract_concepts(content)
+        }
+        
+        # Parse structured output if requested
+        if structured_output:
+            try:
+                result["structured_data"] = serialization.loads(content)
+            except serialization.JSONDecodeError:
+                result["structured_data"] = None
+                result["parse_error"] = "Failed to parse JSON response"
+                
+        return result
+    
+    async def _embed_many(self, prompts: List[str]) -> List[Optional[List[float]]]:
+        """Embed prompts for the semantic cache tier in one call, with None for any unavailable"""
+        if not prompts or not self.cache.semantic_enabled:
+            return [None] * len(prompts)
+            
+        try:
+            response = await self.client.embeddings.create(model=self.embedding_model, input=prompts)
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        except Exception:
+            # The semantic tier is best-effort; fall back to a regular query
+            return [None] * len(prompts)
+    
     def _build_prompt(self, prompt: str, context: Optional[List[Dict[str, Any]]], 
                       structured_output: bool = False) -> str:
         """
@@ -140,7 +345,7 @@ class AIManager:
         if context:
             filtered_context = [
                 item for item in context 
-                if item.get("type") != "conversation_history"
+                if item.get("type") not in _HISTORY_CONTEXT_TYPES
             ]
         else:
             filtered_context = []
@@ -162,14 +367,18 @@ class AIManager:
             
         return f"{context_text}\n\n### QUERY:\n{prompt}{output_instructions}"
     
-    def _extract_sources(self, response: str, context: Optional[List[Dict[str, Any]]]) -> List[str]:
-        """Extract source note IDs from context that were likely used in the response"""
+    @staticmethod
+    def _note_context(context: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Get the note items from a query context"""
         if not context:
             return []
-            
+        return [item for item in context if item.get("type") == "note"]
+    
+    def _extract_sources(self, response: str, note_context: List[Dict[str, Any]]) -> List[str]:
+        """Extract source note IDs from the note context that were likely used in the response"""
         # Placeholder implementation - in a real system, this would use more
         # sophisticated NLP techniques to determine which sources were used
-        return [item.get("id") for item in context if item.get("type") == "note"]
+        return [item["id"] for item in note_context if "id" in item]
     
     def _extract_concepts(self, response: str) -> List[str]:
         """Extract concepts mentioned in the AI response"""
@@ -234,7 +443,7 @@ class AIManager:
             Dictionary with confirmation request text
         """
         # Format the proposed actions as a string
-        actions_str = json.dumps(proposed_actions, indent=2)
+        actions_str = serialization.dumps(proposed_actions, indent=True)
         
         prompt = f"""
         The user has requested: "{user_input}"
@@ -255,10 +464,12 @@ class AIManager:
                 "content": conversation_history
             })
             
+        # The summary describes these exact actions, so a similar prompt's won't do
         result = await self.query(
             prompt,
             context,
-            prompt_type="confirmation"
+            prompt_type="confirmation",
+            semantic=False
         )
         
         return result
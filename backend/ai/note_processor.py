@@ -7,25 +7,74 @@ creation of graph relationships.
 """
 from typing import Dict, List, Any, Optional
 import asyncio
+import hashlib
 
-from backend.ai.manager import AIManager
+from pydantic import BaseModel, Field, ValidationError
+
+from backend.ai.batching import BatchingAIManager
+from backend.ai.cache import content_cached
+from backend.core import serialization
 from backend.db.graph_manager import GraphManager
 
+# Philosophical categories notes are classified into, in prompt order
+_CATEGORY_NAMES = ("Teleology", "Causality", "Epistemology", "Ontology", "Axiology", "Phenomenology", "Temporality")
+CATEGORIES = frozenset(_CATEGORY_NAMES)
+
+# The static instructions come first so the provider can reuse the cached
+# prompt prefix across notes; only the note content varies
+_EXTRACTION_PROMPT_PREFIX = f"""
+Analyze the following note and extract:
+1. Key concepts (nouns or noun phrases that represent distinct ideas)
+2. Philosophical categories that apply (from: {", ".join(_CATEGORY_NAMES)})
+3. Suggested relationships between concepts and categories
+
+Format your response as JSON with these keys:
+- concepts: array of strings
+- categories: array of objects with 'name' and 'confidence' (0-1)
+- relationships: array of objects with 'source', 'target', and 'type'
+
+Note: """
+
+# Extra attempts made when the AI response does not match ExtractionResult
+_EXTRACTION_RETRIES = 2
+
+class ExtractedCategory(BaseModel):
+    """A philosophical category assigned to a note"""
+    name: str
+    confidence: float = Field(ge=0.0, le=1.0)
+
+class ExtractedRelationship(BaseModel):
+    """A relationship suggested between extracted entities"""
+    source: str
+    target: str
+    type: str
+
+class ExtractionResult(BaseModel):
+    """Schema the AI extraction response is validated against"""
+    concepts: List[str] = Field(default_factory=list)
+    categories: List[ExtractedCategory] = Field(default_factory=list)
+    relationships: List[ExtractedRelationship] = Field(default_factory=list)
+
+class ExtractionError(Exception):
+    """Raised when the AI does not return a valid extraction result"""
+
 class NoteProcessor:
     """
     Processes notes to extract concepts, assign categories, and create graph relationships
     """
     
-    def __init__(self, ai_manager: AIManager, graph_manager: GraphManager):
+    def __init__(self, ai_manager: BatchingAIManager, graph_manager: GraphManager):
         """
         Initialize the note processor
         
         Args:
-            ai_manager: Instance of AIManager for AI processing
+            ai_manager: Batching AI manager, so concurrent extractions share provider calls
             graph_manager: Instance of GraphManager for database operations
         """
         self.ai_manager = ai_manager
         self.graph_manager = graph_manager
+        # Single-flight: identical notes being processed concurrently share one task
+        self._inflight: Dict[str, asyncio.Task] = {}
         
     async def process_note(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -38,14 +87,25 @@ class NoteProcessor:
         Returns:
             Dictionary with the processed note data including extracted concepts and categories
         """
-        # Create the note in the graph database
-        note = self.graph_manager.create_note(content, metadata)
+        key = hashlib.blake2b(
+            content.encode() + b"\x1f" + serialization.dumpb(metadata or {}), digest_size=16
+        ).hexdigest()
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.create_task(self._process_note(content, metadata))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            
+        # Shielded so one caller going away does not cancel the work for the others
+        return await asyncio.shield(task)
         
-        # Extract concepts and categories using AI
+    async def _process_note(self, content: str, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Process a note; see process_note"""
+        # Extract concepts and categories using AI before writing anything, so a
+        # failed extraction leaves no partial note behind
         extraction_result = await self._extract_concepts_and_categories(content)
         
-        # Create concepts and relationships in the graph
-        await self._create_graph_entities(note["id"], extraction_result)
+        # Create the note, concepts, and relationships in the graph
+        note = await self._create_graph_entities(content, metadata, extraction_result)
         
         # Return the complete result
         return {
@@ -55,6 +115,7 @@ class NoteProcessor:
             "relationships": extraction_result.get("relationships", [])
         }
         
+    @content_cached("extract")
     async def _extract_concepts_and_categories(self, content: str) -> Dict[str, Any]:
         """
         Use AI to extract concepts and categories from note content
@@ -66,66 +127,60 @@ class NoteProcessor:
             Dictionary with extracted concepts, categories, and suggested relationships
         """
         # Construct a prompt for the AI to extract concepts and categories
-        prompt = f"""
-        Analyze the following note and extract:
-        1. Key concepts (nouns or noun phrases that represent distinct ideas)
-        2. Philosophical categories that apply (from: Teleology, Causality, Epistemology, Ontology, Axiology, Phenomenology, Temporality)
-        3. Suggested relationships between concepts and categories
-        
-        Note: {content}
+        prompt = _EXTRACTION_PROMPT_PREFIX + content
         
-        Format your response as JSON with these keys:
-        - concepts: array of strings
-        - categories: array of objects with 'name' and 'confidence' (0-1)
-        - relationships: array of objects with 'source', 'target', and 'type'
-        """
-        
-        # Query the AI
-        result = await self.ai_manager.query(prompt)
-        
-        # In a real implementation, we would parse the JSON from the AI response
-        # For now, we'll return a placeholder result
-        return {
-            "concepts": ["concept1", "concept2"],
-            "categories": [
-                {"name": "Epistemology", "confidence": 0.8},
-                {"name": "Ontology", "confidence": 0.5}
-            ],
-            "relationships": [
-                {"source": "note_id", "target": "concept1", "type": "ABOUT"},
-                {"source": "concept1", "target": "Epistemology", "type": "BELONGS_TO"}
-            ]
-        }
+        for attempt in range(_EXTRACTION_RETRIES + 1):
+            # Query the AI in JSON mode
+            result = await self.ai_manager.query(prompt, structured_output=True)
+            if "error" in result:
+                raise ExtractionError(result["error"])
+                
+            # Parse and validate the JSON in one pass
+            try:
+                extraction = ExtractionResult.model_validate_json(result["response"])
+                break
+            except ValidationError as e:
+                # Retry with the validation errors appended; this also keeps the
+                # retry from being answered by the cached invalid response
+                error = e
+                prompt = (
+                    f"{_EXTRACTION_PROMPT_PREFIX}{content}\n\n"
+                    f"Your previous response did not match the required format:\n{e}\n"
+                    "Respond again with valid JSON only."
+                )
+        else:
+            raise ExtractionError(f"Invalid extraction response: {error}")
+            
+        # Only keep categories from the known set
+        extraction.categories = [category for category in extraction.categories if category.name in CATEGORIES]
+        return extraction.model_dump()
         
-    async def _create_graph_entities(self, note_id: str, extraction_result: Dict[str, Any]) -> None:
+    async def _create_graph_entities(self, content: str, metadata: Optional[Dict[str, Any]],
+                                     extraction_result: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Create concepts, categories, and relationships in the graph based on extraction results
+        Create the note, its concepts, categories, and relationships in the graph
         
         Args:
-            note_id: ID of the note being processed
+            content: The note content
+            metadata: Optional metadata for the note
             extraction_result: Result from concept/category extraction
-        """
-        # Create concepts and track their IDs
-        concept_ids = {}
-        for concept_name in extraction_result.get("concepts", []):
-            concept = self.graph_manager.create_concept(concept_name)
-            concept_ids[concept_name] = concept["id"]
             
-            # Create relationship from note to concept
-            self.graph_manager.create_relationship(
-                note_id, 
-                concept["id"], 
-                "ABOUT", 
-                {}
-            )
+        Returns:
+            Dictionary with the created note data
+        """
+        # Get or create every concept in one round-trip
+        concept_ids = await self.graph_manager.bulk_create_concepts(extraction_result.get("concepts", []))
         
-        # Create categories and relationships
-        for category in extraction_result.get("categories", []):
-            # Create category relationship with confidence weight
-            for concept_name, concept_id in concept_ids.items():
-                self.graph_manager.create_relationship(
-                    concept_id,
-                    category["name"],  # Using name as ID for categories
-                    "BELONGS_TO",
-                    {"weight": category["confidence"]}
-                )
+        note, _ = await asyncio.gather(
+            # The note and its relationship to each concept, in one transaction
+            self.graph_manager.create_note_with_links(content, metadata, links=[
+                (concept_id, "ABOUT", None) for concept_id in concept_ids.values()
+            ]),
+            # Category relationships with confidence weight
+            self.graph_manager.bulk_assign_categories([
+                {"concept_id": concept_id, "category": category["name"], "weight": category["confidence"]}
+                for category in extraction_result.get("categories", [])
+                for concept_id in concept_ids.values()
+            ])
+        )
+        return note
@@ -4,14 +4,27 @@ Noterer API Server
 This module provides the FastAPI application that serves as the backend API
 for the Noterer application.
 """
+import asyncio
+
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+
+from backend.api.dependencies import connect_graph_manager
+from backend.api.middleware import PathGZipMiddleware
+from backend.ai.manager import AIManager
+from backend.ai.batching import BatchingAIManager
+from backend.ai.conversation_controller import ConversationalFlowController
+from backend.ai.conversation_store import ConversationStore
+from backend.core.redis_client import close_redis
 
 # Create FastAPI app
 app = FastAPI(
     title="Noterer API",
     description="API for the Noterer AI-powered Graph-Based Note Taker",
-    version="0.1.0"
+    version="0.1.0",
+    # Encode responses with orjson rather than the stdlib json module
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware to allow frontend communication
@@ -23,6 +36,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress only the heavy conversation responses; cheap polls skip the gzip pass
+app.add_middleware(
+    PathGZipMiddleware,
+    prefixes=("/conversation/input", "/conversation/confirm"),
+    minimum_size=1024
+)
+
 # Import route modules
 from backend.api.routes import notes, concepts, graph, ai, conversation
 
@@ -33,6 +53,41 @@ app.include_router(graph.router, prefix="/graph", tags=["graph"])
 app.include_router(ai.router, prefix="/ai", tags=["ai"])
 app.include_router(conversation.router, prefix="/conversation", tags=["conversation"])
 
+@app.on_event("startup")
+async def startup():
+    """Create shared services and start background tasks"""
+    app.state.ai_manager = AIManager()
+    app.state.batching_ai_manager = BatchingAIManager(app.state.ai_manager)
+    app.state.batching_ai_manager.start()
+    app.state.conversation_controller = ConversationalFlowController(app.state.ai_manager)
+    # Connected on first use by get_graph_manager, so the API starts without Neo4j
+    app.state.graph_manager = None
+    app.state.note_processor = None
+    app.state.conversation_store = ConversationStore()
+    app.state.conversation_sweeper = asyncio.create_task(app.state.conversation_store.run_sweeper())
+    # Connect ahead of the first request, so it doesn't pay for the driver
+    # handshake and schema check
+    app.state.graph_prewarm = asyncio.create_task(_prewarm_graph_manager())
+
+async def _prewarm_graph_manager():
+    """Connect the graph manager in the background"""
+    try:
+        await connect_graph_manager(app.state)
+    except Exception:
+        # Neo4j may not be up yet; the first request that needs it retries
+        pass
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background tasks and release shared connections"""
+    app.state.conversation_sweeper.cancel()
+    app.state.graph_prewarm.cancel()
+    await app.state.batching_ai_manager.stop()
+    await app.state.ai_manager.close()
+    if app.state.graph_manager is not None:
+        await app.state.graph_manager.close()
+    await close_redis()
+
 @app.get("/")
 async def root():
     """Root endpoint that provides API information"""
@@ -0,0 +1,59 @@
+"""
+API Dependencies
+
+This module provides the FastAPI dependencies that hand shared, process-wide
+service instances to route handlers. The instances are created by the app's
+startup handler (or on first use, for the graph database) and released on
+shutdown, so connection pools are reused across requests.
+"""
+import asyncio
+
+from fastapi import Request
+
+from backend.ai.manager import AIManager
+from backend.ai.conversation_controller import ConversationalFlowController
+from backend.ai.conversation_store import ConversationStore
+from backend.ai.note_processor import NoteProcessor
+from backend.db.graph_manager import GraphManager
+
+# Guards first-use creation so concurrent requests share one driver
+_graph_manager_lock = asyncio.Lock()
+
+def get_ai_manager(request: Request) -> AIManager:
+    """Get the shared AI manager instance"""
+    return request.app.state.ai_manager
+
+async def get_graph_manager(request: Request) -> GraphManager:
+    """Get the shared graph manager instance, connecting on first use"""
+    return await connect_graph_manager(request.app.state)
+
+async def connect_graph_manager(state) -> GraphManager:
+    """Create and connect the shared graph manager on app state, if not done yet"""
+    if getattr(state, "graph_manager", None) is None:
+        async with _graph_manager_lock:
+            if getattr(state, "graph_manager", None) is None:
+                graph_manager = GraphManager()
+                try:
+                    await graph_manager.verify_connection()
+                    await graph_manager.ensure_schema()
+                except Exception:
+                    await graph_manager.close()
+                    raise
+                state.graph_manager = graph_manager
+    return state.graph_manager
+
+async def get_note_processor(request: Request) -> NoteProcessor:
+    """Get the shared note processor, so concurrent identical notes are processed once"""
+    graph_manager = await get_graph_manager(request)
+    state = request.app.state
+    if getattr(state, "note_processor", None) is None:
+        state.note_processor = NoteProcessor(state.batching_ai_manager, graph_manager)
+    return state.note_processor
+
+def get_conversation_store(request: Request) -> ConversationStore:
+    """Get the shared conversation store"""
+    return request.app.state.conversation_store
+
+def get_conversation_controller(request: Request) -> ConversationalFlowController:
+    """Get the shared conversation controller instance"""
+    return request.app.state.conversation_controller
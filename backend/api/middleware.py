@@ -0,0 +1,31 @@
+"""
+API Middleware
+
+This module provides middleware used by the FastAPI application.
+"""
+from typing import Tuple
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+class PathGZipMiddleware:
+    """GZip-compress responses only for requests under the given path prefixes"""
+    
+    def __init__(self, app: ASGIApp, prefixes: Tuple[str, ...], minimum_size: int = 1024):
+        """
+        Initialize the middleware
+        
+        Args:
+            app: The ASGI application to wrap
+            prefixes: Request path prefixes whose responses are compressed
+            minimum_size: Smallest response body, in bytes, worth compressing
+        """
+        self.app = app
+        self.prefixes = prefixes
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+        
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(self.prefixes):
+            await self.gzip(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
@@ -4,7 +4,7 @@ AI Models
 This module provides Pydantic models for AI interaction data validation and serialization.
 """
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Any, Dict, List, Literal, Optional
 
 class AIQuery(BaseModel):
     """Model for AI query requests"""
@@ -21,3 +21,18 @@ class AIResponse(BaseModel):
     class Config:
         """Pydantic configuration"""
         from_attributes = True
+    
+class AIOperation(BaseModel):
+    """Model for one operation in a batched AI request"""
+    op: Literal["process", "query"] = Field(..., description="Operation to run: process a note or query the AI")
+    content: Optional[str] = Field(default=None, description="Note content, for process operations")
+    prompt: Optional[str] = Field(default=None, description="The user's prompt, for query operations")
+    context_ids: Optional[List[str]] = Field(default=None, description="IDs of notes to include as context")
+    
+class AIBatchRequest(BaseModel):
+    """Model for batched AI requests"""
+    operations: List[AIOperation] = Field(..., description="Operations to run, in order")
+    
+class AIBatchResponse(BaseModel):
+    """Model for batched AI responses"""
+    results: List[Dict[str, Any]] = Field(..., description="Result of each operation, in request order")
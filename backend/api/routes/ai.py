@@ -3,22 +3,60 @@ AI API Routes
 
 This module provides API endpoints for AI interactions.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Optional, Dict
+import asyncio
 
-from backend.api.models.ai import AIQuery, AIResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, List, Optional, Dict
+
+from backend.ai.manager import AIManager
+from backend.api.dependencies import get_ai_manager
+from backend.api.models.ai import AIBatchRequest, AIBatchResponse, AIOperation, AIQuery, AIResponse
+from backend.core import serialization
 
 router = APIRouter()
 
+def _sse(event: Dict) -> bytes:
+    """Encode an event as a Server-Sent Events message"""
+    return b"data: " + serialization.dumpb(event) + b"\n\n"
+
+async def _stream_query(query: AIQuery, ai_manager: AIManager) -> AsyncIterator[bytes]:
+    """Yield the AI response as SSE delta events, ending with a metadata event"""
+    chunks = []
+    try:
+        async for delta in ai_manager.query_stream(query.prompt):
+            chunks.append(delta)
+            yield _sse({"type": "delta", "content": delta})
+    except Exception as e:
+        yield _sse({"type": "error", "error": str(e)})
+        return
+        
+    result = ai_manager.build_result("".join(chunks))
+    yield _sse({
+        "type": "metadata",
+        "source_notes": result["source_notes"],
+        "concepts_referenced": result["concepts_referenced"]
+    })
+
 @router.post("/query", response_model=AIResponse)
-async def query_ai(query: AIQuery):
-    """Send a query to the AI and get a response"""
-    # This will be implemented to use the AIManager
-    return {
-        "response": f"This is a placeholder response to: {query.prompt}",
-        "source_notes": [f"note-{i}" for i in range(3)],
-        "concepts_referenced": [f"concept-{i}" for i in range(2)]
-    }
+async def query_ai(query: AIQuery, request: Request, ai_manager: AIManager = Depends(get_ai_manager)):
+    """
+    Send a query to the AI and get a response
+    
+    Clients that accept text/event-stream receive the response as Server-Sent
+    Events while it is generated; others get the complete response as JSON.
+    """
+    if "text/event-stream" in request.headers.get("accept", ""):
+        return StreamingResponse(
+            _stream_query(query, ai_manager),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+        
+    result = await ai_manager.query(query.prompt)
+    if "error" in result:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=result["error"])
+    return result
 
 @router.post("/process-note")
 async def process_note(note_content: Dict[str, str]):
@@ -35,3 +73,19 @@ async def process_note(note_content: Dict[str, str]):
             {"source": "concept1", "target": "Epistemology", "type": "BELONGS_TO"}
         ]
     }
+
+async def _run_operation(operation: AIOperation, ai_manager: AIManager) -> Dict[str, Any]:
+    """Run one operation of a batch; failures are reported in its result"""
+    if operation.op == "process":
+        return await process_note({"content": operation.content or ""})
+    return await ai_manager.query(operation.prompt or "")
+
+@router.post("/batch", response_model=AIBatchResponse)
+async def batch(batch_request: AIBatchRequest, ai_manager: AIManager = Depends(get_ai_manager)):
+    """
+    Run several AI operations in one round-trip
+    
+    Operations run concurrently; results are returned in request order.
+    """
+    results = await asyncio.gather(*(_run_operation(op, ai_manager) for op in batch_request.operations))
+    return {"results": results}
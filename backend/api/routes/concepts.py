@@ -4,9 +4,13 @@ Concepts API Routes
 This module provides API endpoints for concept operations.
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 
+from backend.api.dependencies import get_graph_manager
 from backend.api.models.concept import ConceptCreate, ConceptRead, ConceptUpdate
+from backend.core import serialization
+from backend.db.graph_manager import GraphManager
 
 router = APIRouter()
 
@@ -23,6 +27,16 @@ async def get_concepts(limit: int = 10, skip: int = 0):
     return [{"id": f"concept-{i}", "name": f"Sample Concept {i}", "description": f"Description for concept {i}"} 
             for i in range(skip, skip + limit)]
 
+@router.get("/stream")
+async def stream_concepts(limit: int = 10, skip: int = 0, graph_manager: GraphManager = Depends(get_graph_manager)):
+    """
+    Stream concepts as newline-delimited JSON for bulk consumers
+    
+    Rows are written as they come off the database cursor, without building
+    or validating the whole page in memory.
+    """
+    return StreamingResponse(serialization.aiter_ndjson(graph_manager.iter_concepts(limit, skip)), media_type="application/x-ndjson")
+
 @router.get("/{concept_id}", response_model=ConceptRead)
 async def get_concept(concept_id: str):
     """Get a specific concept by ID"""
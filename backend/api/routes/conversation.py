@@ -9,13 +9,18 @@ from typing import Dict, Any
 
 from backend.ai.manager import AIManager
 from backend.ai.conversation_controller import ConversationalFlowController, Conversation
+from backend.ai.conversation_store import ConversationStore
+from backend.api.dependencies import (
+    get_ai_manager, get_graph_manager, get_conversation_store, get_conversation_controller
+)
+from backend.core.ids import new_id
 from backend.db.graph_manager import GraphManager
 
-# Create router
-router = APIRouter()
+# Cheap state reads and lifecycle calls
+router_ro = APIRouter()
 
-# In-memory store for active conversations (in a real app, would use a database)
-active_conversations = {}
+# Expensive AI and graph operations; responses are compressed (see app.py)
+router_rw = APIRouter()
 
 # Action handlers for different action types
 async def handle_create_note(action: Dict[str, Any], graph_manager: GraphManager) -> Dict[str, Any]:
@@ -23,20 +28,12 @@ async def handle_create_note(action: Dict[str, Any], graph_manager: GraphManager
     content = action.get("content", "")
     concepts = action.get("concepts", [])
     
-    # Create the note
-    note = graph_manager.create_note(content)
-    
-    # Process concepts and relationships if provided
-    for concept_name in concepts:
-        # Create or get concept
-        concept = graph_manager.create_concept(concept_name)
-        
-        # Create relationship from note to concept
-        graph_manager.create_relationship(
-            note["id"], 
-            concept["id"], 
-            "ABOUT"
-        )
+    # Get or create its concepts, then create the note linked to them in one
+    # transaction so a failed link never leaves an orphaned note
+    concept_ids = await graph_manager.bulk_create_concepts(concepts)
+    note = await graph_manager.create_note_with_links(content, links=[
+        (concept_id, "ABOUT", None) for concept_id in concept_ids.values()
+    ])
     
     return {
         "note_id": note["id"],
@@ -50,7 +47,7 @@ async def handle_create_concept(action: Dict[str, Any], graph_manager: GraphMana
     categories = action.get("categories", [])
     
     # Create the concept
-    concept = graph_manager.create_concept(name, description, categories)
+    concept = await graph_manager.create_concept(name, description, categories)
     
     return {
         "concept_id": concept["id"],
@@ -65,7 +62,7 @@ async def handle_create_relationship(action: Dict[str, Any], graph_manager: Grap
     properties = action.get("properties", {})
     
     # Create the relationship
-    graph_manager.create_relationship(
+    await graph_manager.create_relationship(
         source_id, 
         target_id, 
         relationship_type, 
@@ -78,54 +75,45 @@ async def handle_create_relationship(action: Dict[str, Any], graph_manager: Grap
         "created": True
     }
 
-# Helper function to get dependencies
-def get_ai_manager():
-    """Get AI manager instance"""
-    return AIManager()
-
-def get_graph_manager():
-    """Get graph manager instance"""
-    return GraphManager()
-
-def get_conversation_controller(ai_manager: AIManager = Depends(get_ai_manager)):
-    """Get conversation controller instance"""
-    return ConversationalFlowController(ai_manager)
+async def get_active_conversation(store: ConversationStore, conversation_id: str) -> Conversation:
+    """Get an active conversation, raising a 404 if it does not exist or has expired"""
+    conversation = await store.get(conversation_id)
+    if conversation is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Conversation with ID {conversation_id} not found"
+        )
+    return conversation
 
-@router.post("/start")
+@router_ro.post("/start")
 async def start_conversation(
     background_tasks: BackgroundTasks,
-    ai_manager: AIManager = Depends(get_ai_manager)
+    ai_manager: AIManager = Depends(get_ai_manager),
+    store: ConversationStore = Depends(get_conversation_store)
 ) -> Dict[str, Any]:
     """Start a new conversation"""
-    # Create a new conversation with a unique ID
-    import uuid
-    conversation_id = str(uuid.uuid4())
+    # Create a new conversation with a unique, time-ordered ID
+    conversation_id = new_id()
     conversation = Conversation(conversation_id)
     
     # Store in active conversations
-    active_conversations[conversation_id] = conversation
+    await store.set(conversation)
     
     return {
         "conversation_id": conversation_id,
         "status": "started"
     }
 
-@router.post("/input/{conversation_id}")
+@router_rw.post("/input/{conversation_id}")
 async def process_user_input(
     conversation_id: str,
     user_input: Dict[str, Any],
     conversation_controller: ConversationalFlowController = Depends(get_conversation_controller),
-    graph_manager: GraphManager = Depends(get_graph_manager)
+    store: ConversationStore = Depends(get_conversation_store)
 ) -> Dict[str, Any]:
     """Process user input in a conversation"""
     # Get the active conversation or return error
-    if conversation_id not in active_conversations:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Conversation with ID {conversation_id} not found"
-        )
-    
-    conversation = active_conversations[conversation_id]
+    conversation = await get_active_conversation(store, conversation_id)
     
     # Get graph context
     context = []
@@ -140,6 +128,7 @@ async def process_user_input(
         user_input["text"],
         context
     )
+    await store.set(conversation)
     
     return {
         "conversation_id": conversation_id,
@@ -149,22 +138,17 @@ async def process_user_input(
         "conversation_state": result["conversation_state"]
     }
 
-@router.post("/confirm/{conversation_id}")
+@router_rw.post("/confirm/{conversation_id}")
 async def process_confirmation(
     conversation_id: str,
     confirmation: Dict[str, bool],
     conversation_controller: ConversationalFlowController = Depends(get_conversation_controller),
-    graph_manager: GraphManager = Depends(get_graph_manager)
+    graph_manager: GraphManager = Depends(get_graph_manager),
+    store: ConversationStore = Depends(get_conversation_store)
 ) -> Dict[str, Any]:
     """Process user confirmation for proposed actions"""
     # Get the active conversation or return error
-    if conversation_id not in active_conversations:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Conversation with ID {conversation_id} not found"
-        )
-    
-    conversation = active_conversations[conversation_id]
+    conversation = await get_active_conversation(store, conversation_id)
     
     # Set up action handlers
     action_handlers = {
@@ -179,6 +163,7 @@ async def process_confirmation(
         confirmation.get("confirmed", False),
         action_handlers
     )
+    await store.set(conversation)
     
     return {
         "conversation_id": conversation_id,
@@ -188,17 +173,14 @@ async def process_confirmation(
         "conversation_state": result["conversation_state"]
     }
 
-@router.get("/{conversation_id}")
-async def get_conversation(conversation_id: str) -> Dict[str, Any]:
+@router_ro.get("/{conversation_id}")
+async def get_conversation(
+    conversation_id: str,
+    store: ConversationStore = Depends(get_conversation_store)
+) -> Dict[str, Any]:
     """Get the current state of a conversation"""
     # Get the active conversation or return error
-    if conversation_id not in active_conversations:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Conversation with ID {conversation_id} not found"
-        )
-    
-    conversation = active_conversations[conversation_id]
+    conversation = await get_active_conversation(store, conversation_id)
     
     return {
         "conversation_id": conversation_id,
@@ -207,20 +189,25 @@ async def get_conversation(conversation_id: str) -> Dict[str, Any]:
         "has_current_turn": conversation.current_turn is not None
     }
 
-@router.delete("/{conversation_id}")
-async def end_conversation(conversation_id: str) -> Dict[str, Any]:
+@router_ro.delete("/{conversation_id}")
+async def end_conversation(
+    conversation_id: str,
+    store: ConversationStore = Depends(get_conversation_store)
+) -> Dict[str, Any]:
     """End and remove a conversation"""
-    # Get the active conversation or return error
-    if conversation_id not in active_conversations:
+    # Remove from active conversations or return error
+    if not await store.delete(conversation_id):
         raise HTTPException(
             status_code=404,
             detail=f"Conversation with ID {conversation_id} not found"
         )
     
-    # Remove from active conversations
-    del active_conversations[conversation_id]
-    
     return {
         "conversation_id": conversation_id,
         "status": "ended"
     }
+
+# Combined router mounted by the app
+router = APIRouter()
+router.include_router(router_ro)
+router.include_router(router_rw)
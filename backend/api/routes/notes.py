@@ -4,9 +4,14 @@ Notes API Routes
 This module provides API endpoints for note operations.
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 
+from backend.ai.note_processor import ExtractionError, NoteProcessor
+from backend.api.dependencies import get_graph_manager, get_note_processor
 from backend.api.models.note import NoteCreate, NoteRead, NoteUpdate
+from backend.core import serialization
+from backend.db.graph_manager import GraphManager
 
 router = APIRouter()
 
@@ -16,6 +21,20 @@ async def create_note(note: NoteCreate):
     # This will be implemented to use the NoteProcessor and GraphManager
     return {"id": "temp-id", "content": note.content, "created_at": "2025-05-21T20:00:00"}
 
+@router.post("/with-ai", status_code=status.HTTP_201_CREATED)
+async def create_note_with_ai(note: NoteCreate, note_processor: NoteProcessor = Depends(get_note_processor)):
+    """
+    Create a note linked to its AI-extracted concepts and categories
+    
+    Saves the client a separate process-note round-trip; the note and its
+    concept links are written in one transaction.
+    """
+    metadata = {"tags": note.tags} if note.tags else None
+    try:
+        return await note_processor.process_note(note.content, metadata)
+    except ExtractionError as e:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
+
 @router.get("/", response_model=List[NoteRead])
 async def get_notes(limit: int = 10, skip: int = 0):
     """Get all notes with pagination"""
@@ -23,6 +42,16 @@ async def get_notes(limit: int = 10, skip: int = 0):
     return [{"id": f"note-{i}", "content": f"Sample note {i}", "created_at": "2025-05-21T20:00:00"} 
             for i in range(skip, skip + limit)]
 
+@router.get("/stream")
+async def stream_notes(limit: int = 10, skip: int = 0, graph_manager: GraphManager = Depends(get_graph_manager)):
+    """
+    Stream notes as newline-delimited JSON for bulk consumers
+    
+    Rows are written as they come off the database cursor, without building
+    or validating the whole page in memory.
+    """
+    return StreamingResponse(serialization.aiter_ndjson(graph_manager.iter_notes(limit, skip)), media_type="application/x-ndjson")
+
 @router.get("/{note_id}", response_model=NoteRead)
 async def get_note(note_id: str):
     """Get a specific note by ID"""
@@ -0,0 +1,28 @@
+"""
+Identifiers
+
+This module provides time-ordered identifiers. UUIDv7 IDs sort by creation
+time, so new keys land next to each other in indexes instead of at random
+positions, and a range of IDs corresponds to a range of creation times.
+"""
+import os
+import time
+import uuid
+
+def _uuid7() -> uuid.UUID:
+    """Build an RFC 9562 UUIDv7: 48-bit Unix ms timestamp, version, variant, random bits"""
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76                          # version
+    value |= ((rand >> 62) & 0xFFF) << 64       # rand_a
+    value |= 0b10 << 62                         # variant
+    value |= rand & 0x3FFF_FFFF_FFFF_FFFF       # rand_b
+    return uuid.UUID(int=value)
+
+# Python 3.14+ ships uuid.uuid7
+uuid7 = getattr(uuid, "uuid7", _uuid7)
+
+def new_id() -> str:
+    """Generate a new time-ordered ID string"""
+    return str(uuid7())
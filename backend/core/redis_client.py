@@ -0,0 +1,35 @@
+"""
+Redis Client
+
+This module provides the shared Redis connection used by backend caches and
+stores. Redis is optional: when the redis package is not installed or
+REDIS_URL is not set, get_redis returns None and callers fall back to
+in-process state.
+"""
+import os
+from typing import Optional
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+_client: Optional["aioredis.Redis"] = None
+
+def get_redis() -> Optional["aioredis.Redis"]:
+    """Get the shared Redis client, or None if Redis is not configured"""
+    global _client
+    url = os.getenv("REDIS_URL")
+    if aioredis is None or not url:
+        return None
+        
+    if _client is None:
+        _client = aioredis.from_url(url)
+    return _client
+
+async def close_redis() -> None:
+    """Close the shared Redis client if one was created"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,45 @@
+"""
+Serialization
+
+This module provides the JSON encode/decode helpers used by the backend.
+orjson is used when it is installed, with the standard library json module
+as a fallback so callers never need to care which one is active.
+"""
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Union
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so one type covers both
+JSONDecodeError = json.JSONDecodeError
+
+try:
+    import orjson
+    
+    def loads(data: Union[str, bytes]) -> Any:
+        """Decode a JSON document"""
+        return orjson.loads(data)
+        
+    def dumps(obj: Any, indent: bool = False) -> str:
+        """Encode an object as a JSON string"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None).decode()
+        
+    def dumpb(obj: Any) -> bytes:
+        """Encode an object as UTF-8 JSON bytes"""
+        return orjson.dumps(obj)
+
+except ImportError:
+    def loads(data: Union[str, bytes]) -> Any:
+        """Decode a JSON document"""
+        return json.loads(data)
+        
+    def dumps(obj: Any, indent: bool = False) -> str:
+        """Encode an object as a JSON string"""
+        return json.dumps(obj, indent=2 if indent else None)
+        
+    def dumpb(obj: Any) -> bytes:
+        """Encode an object as UTF-8 JSON bytes"""
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+async def aiter_ndjson(rows: AsyncIterable[Any]) -> AsyncIterator[bytes]:
+    """Encode rows lazily as newline-delimited JSON, one line per row"""
+    async for row in rows:
+        yield dumpb(row) + b"\n"
@@ -3,47 +3,292 @@ Graph Manager
 
 This module provides a manager for Neo4j graph database operations.
 """
+import asyncio
+import logging
 import os
-from neo4j import GraphDatabase, Driver, AsyncDriver, basic_auth
-from neo4j.exceptions import Neo4jError
-from typing import Dict, List, Any, Optional, Union, Tuple
+import re
+from neo4j import AsyncGraphDatabase, AsyncDriver, READ_ACCESS, WRITE_ACCESS, basic_auth
+from neo4j.exceptions import DriverError, Neo4jError
+from typing import Dict, List, Any, Final, Optional, Union, Tuple, AsyncIterator, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# Cypher queries, kept as constants so each statement has one fixed text for
+# the server plan cache. Relationship types cannot be parameters, so queries
+# over them are templates formatted with the type.
+
+Q_PING: Final[str] = "RETURN 1 AS num"
+
+# Touches every node and relationship so their store pages are loaded into the page cache
+Q_WARMUP: Final[str] = """
+MATCH (n)
+OPTIONAL MATCH (n)-[r]-()
+RETURN count(n) + count(r) AS touched
+"""
+
+# The database schema, also applied by scripts/setup_db.py. Unique constraints
+# on the properties nodes are matched by are each backed by an index, so
+# lookups by these properties are index seeks rather than label scans
+Q_SCHEMA: Final[Tuple[str, ...]] = (
+    "CREATE CONSTRAINT note_id_unique IF NOT EXISTS FOR (n:Note) REQUIRE n.id IS UNIQUE",
+    "CREATE CONSTRAINT concept_id_unique IF NOT EXISTS FOR (c:Concept) REQUIRE c.id IS UNIQUE",
+    "CREATE CONSTRAINT concept_name_unique IF NOT EXISTS FOR (c:Concept) REQUIRE c.name IS UNIQUE",
+    "CREATE CONSTRAINT category_name_unique IF NOT EXISTS FOR (cat:Category) REQUIRE cat.name IS UNIQUE",
+    # Note content search
+    "CREATE TEXT INDEX note_content_index IF NOT EXISTS FOR (n:Note) ON (n.content)",
+    # Newest-first note listing
+    "CREATE INDEX note_timestamp_index IF NOT EXISTS FOR (n:Note) ON (n.created_at)",
+)
+
+Q_CREATE_NOTES: Final[str] = """
+UNWIND $rows AS row
+CREATE (n:Note {
+    id: randomUUID(),
+    content: row.content,
+    created_at: datetime(),
+    updated_at: datetime()
+})
+SET n += row.metadata
+RETURN n {.*, created_at: toString(n.created_at), updated_at: toString(n.updated_at)} AS n
+"""
+
+Q_GET_NOTE: Final[str] = """
+MATCH (n:Note {id: $note_id})
+RETURN n
+"""
+
+# List rows carry a content preview rather than whole nodes, so row size
+# doesn't grow with note length
+Q_GET_NOTES: Final[str] = """
+MATCH (n:Note)
+RETURN n.id AS id, toString(n.created_at) AS created_at, toString(n.updated_at) AS updated_at,
+       left(n.content, $preview_length) AS preview
+ORDER BY n.created_at DESC
+SKIP $skip
+LIMIT $limit
+"""
+
+# Paged on the stored datetime before projecting, since the projection
+# shadows n and its string timestamps don't sort across timezone offsets
+Q_ITER_NOTES: Final[str] = """
+MATCH (n:Note)
+WITH n ORDER BY n.created_at DESC SKIP $skip LIMIT $limit
+RETURN n {.*, created_at: toString(n.created_at), updated_at: toString(n.updated_at)} AS n
+"""
+
+# A null $content leaves the existing content in place
+Q_UPDATE_NOTE: Final[str] = """
+MATCH (n:Note {id: $note_id})
+SET n += $metadata, n.content = coalesce($content, n.content), n.updated_at = datetime()
+RETURN n
+"""
+
+Q_DELETE_NOTE: Final[str] = """
+MATCH (n:Note {id: $note_id})
+DETACH DELETE n
+RETURN count(n) as deleted_count
+"""
+
+Q_CREATE_CONCEPT: Final[str] = """
+MERGE (c:Concept {name: $name})
+SET c.id = coalesce(c.id, randomUUID()),
+    c.description = coalesce($description, c.description)
+RETURN c
+"""
+
+Q_LINK_CATEGORIES: Final[str] = """
+MATCH (c:Concept {id: $concept_id})
+UNWIND $categories AS category
+MERGE (cat:Category {name: category})
+MERGE (c)-[:BELONGS_TO]->(cat)
+"""
+
+Q_ITER_CONCEPTS: Final[str] = """
+MATCH (c:Concept)
+WITH c ORDER BY c.name SKIP $skip LIMIT $limit
+OPTIONAL MATCH (c)-[r:BELONGS_TO]->(cat:Category)
+RETURN c.id AS id, c.name AS name, c.description AS description,
+       [x IN collect({name: cat.name, weight: coalesce(r.weight, 1.0)}) WHERE x.name IS NOT NULL] AS categories
+"""
+
+Q_MERGE_CONCEPTS: Final[str] = """
+UNWIND $rows AS r
+MERGE (c:Concept {name: r.name})
+SET c.id = coalesce(c.id, randomUUID())
+RETURN r.name AS name, c.id AS id
+"""
+
+Q_ASSIGN_CATEGORIES: Final[str] = """
+UNWIND $rows AS r
+MATCH (c:Concept {id: r.concept_id})
+MERGE (cat:Category {name: r.category})
+MERGE (c)-[rel:BELONGS_TO]->(cat)
+SET rel.weight = r.weight
+"""
+
+# Only ids on Note and Concept are indexed, so the endpoints are labelled to get
+# index seeks; ids on any other label don't match. Relationships are merged, so
+# repeating one updates its properties instead of adding a parallel edge
+Q_CREATE_RELATIONSHIP: Final[str] = """
+MATCH (source:Note|Concept {{id: $source_id}}), (target:Note|Concept {{id: $target_id}})
+MERGE (source)-[r:`{relationship_type}`]->(target)
+ON CREATE SET r.created_at = datetime()
+SET r += $properties
+RETURN source, r, target
+"""
+
+Q_MERGE_RELATIONSHIPS: Final[str] = """
+UNWIND $rows AS r
+MATCH (source:Note|Concept {{id: r.source}}), (target:Note|Concept {{id: r.target}})
+MERGE (source)-[rel:`{relationship_type}`]->(target)
+ON CREATE SET rel.created_at = datetime()
+SET rel += r.properties
+"""
+# Seconds a managed transaction is retried on transient errors before giving up
+_MAX_TRANSACTION_RETRY_TIME = 15.0
+
+# Seconds to wait for a pooled connection, and before a connection is replaced
+_CONNECTION_ACQUISITION_TIMEOUT = 30.0
+_MAX_CONNECTION_LIFETIME = 3600
+
+# Characters of content included in note list rows
+_PREVIEW_LENGTH = 200
+
+# Rows sent per UNWIND statement in bulk writes
+_UNWIND_BATCH_SIZE = 20_000
+
+# Relationship types are formatted into query text, so only plain identifiers are accepted
+_RELATIONSHIP_TYPE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+def _relationship_query(template: str, relationship_type: str) -> str:
+    """Format a relationship query template, rejecting unsafe relationship types"""
+    if not _RELATIONSHIP_TYPE.fullmatch(relationship_type):
+        raise ValueError(f"Invalid relationship type: {relationship_type!r}")
+    return template.format(relationship_type=relationship_type)
+
+def _batches(rows: List[Dict[str, Any]]):
+    """Split rows into UNWIND-sized chunks"""
+    for start in range(0, len(rows), _UNWIND_BATCH_SIZE):
+        yield rows[start:start + _UNWIND_BATCH_SIZE]
 
 class GraphManager:
     """Manager for Neo4j graph database operations"""
     
-    def __init__(self, uri: str = None, username: str = None, password: str = None):
+    def __init__(self, uri: str = None, username: str = None, password: str = None,
+                 database: str = None, pool_size: int = None, warmup: bool = True):
         """
         Initialize the Neo4j connection
         
+        The driver connects lazily; call verify_connection() to check the
+        database is reachable.
+        
         Args:
             uri: Neo4j connection URI (default: from environment variable)
             username: Neo4j username (default: from environment variable)
             password: Neo4j password (default: from environment variable)
+            database: Target database (default: from environment variable); naming it
+                explicitly skips the home database lookup on each session
+            pool_size: Maximum connections per server (default: from environment
+                variable, else 100); size it to the expected concurrent requests
+            warmup: Whether verify_connection() starts warming the page cache in the
+                background, so early requests don't read cold pages from disk
         """
         self.uri = uri or os.getenv("NEO4J_URI", "neo4j://localhost:7687")
         self.username = username or os.getenv("NEO4J_USERNAME", "neo4j")
         self.password = password or os.getenv("NEO4J_PASSWORD", "password")
-        self.driver = GraphDatabase.driver(
+        self.database = database or os.getenv("NEO4J_DATABASE", "neo4j")
+        self.pool_size = pool_size or int(os.getenv("NEO4J_POOL_SIZE", "100"))
+        # A neo4j:// (or neo4j+s://) URI routes sessions by access mode, so reads
+        # can be served by replicas in a cluster
+        self.driver: AsyncDriver = AsyncGraphDatabase.driver(
             self.uri, 
-            auth=basic_auth(self.username, self.password)
+            auth=basic_auth(self.username, self.password),
+            max_connection_pool_size=self.pool_size,
+            connection_acquisition_timeout=_CONNECTION_ACQUISITION_TIMEOUT,
+            max_connection_lifetime=_MAX_CONNECTION_LIFETIME,
+            max_transaction_retry_time=_MAX_TRANSACTION_RETRY_TIME
         )
-        # Test connection on initialization
-        self._test_connection()
+        # Shared by every session so reads routed to a replica in a cluster
+        # still observe this process's earlier writes
+        self._bookmarks = AsyncGraphDatabase.bookmark_manager()
+        self.warmup = warmup
+        self._warmup_task: Optional[asyncio.Task] = None
     
-    def _test_connection(self) -> None:
+    async def verify_connection(self) -> None:
         """Test the Neo4j connection"""
-        with self.driver.session() as session:
+        async with self.driver.session(database=self.database) as session:
             # Simple query to test connection
-            result = session.run("RETURN 1 AS num")
-            assert result.single()["num"] == 1
+            result = await session.run(Q_PING)
+            record = await result.single()
+            assert record["num"] == 1
             
-    def close(self) -> None:
+        if self.warmup and self._warmup_task is None:
+            self._warmup_task = asyncio.create_task(self._warm_up())
+            
+    async def _warm_up(self) -> None:
+        """Load the graph into the page cache"""
+        try:
+            async with self.driver.session(database=self.database, default_access_mode=READ_ACCESS) as session:
+                result = await session.run(Q_WARMUP)
+                await result.consume()
+        except (DriverError, Neo4jError):
+            # Warming is best effort; queries still work against a cold cache
+            pass
+            
+    async def ensure_schema(self) -> None:
+        """
+        Create the constraints and backing indexes queries rely on, if missing
+        
+        A constraint the existing data violates (such as duplicate concept
+        names from before names were merged) is logged and skipped, so the
+        connection stays usable until the data is cleaned up.
+        """
+        # Each statement runs as its own auto-commit transaction, so one the
+        # existing data violates doesn't roll back the others
+        async with self.driver.session(database=self.database) as session:
+            for query in Q_SCHEMA:
+                try:
+                    result = await session.run(query)
+                    await result.consume()
+                except Neo4jError as e:
+                    logger.error("Could not apply schema statement %r: %s", query, e)
+                
+    async def close(self) -> None:
         """Close the Neo4j connection"""
-        self.driver.close()
+        if self._warmup_task is not None:
+            self._warmup_task.cancel()
+        await self.driver.close()
+        
+    async def _write(self, tx_function: Callable[..., Awaitable[Any]], *args) -> Any:
+        """Run a transaction function as a managed write transaction"""
+        # Async sessions are cheap and borrow pooled connections, so each call gets its own
+        async with self.driver.session(database=self.database, default_access_mode=WRITE_ACCESS,
+                                       bookmark_manager=self._bookmarks) as session:
+            return await session.execute_write(tx_function, *args)
+        
+    async def _read(self, tx_function: Callable[..., Awaitable[Any]], *args) -> Any:
+        """Run a transaction function as a managed read transaction"""
+        # Read access lets the routing driver send these to a read replica
+        async with self.driver.session(database=self.database, default_access_mode=READ_ACCESS,
+                                       bookmark_manager=self._bookmarks) as session:
+            return await session.execute_read(tx_function, *args)
+        
+    async def with_transaction(self, work: Callable[[Any], Awaitable[Any]]) -> Any:
+        """
+        Run several operations in one write transaction
+        
+        Args:
+            work: Coroutine function receiving the transaction, which can await several
+                of the _*_tx transaction functions (e.g. create a note and its relationships)
+                
+        Returns:
+            Whatever work returns
+        """
+        return await self._write(work)
     
     # Note CRUD operations
     
-    def create_note(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def create_note(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Create a new note in the graph database
         
@@ -54,179 +299,231 @@ class GraphManager:
         Returns:
             Dictionary with the created note data
         """
-        with self.driver.session() as session:
-            result = session.write_transaction(
-                self._create_note_tx, content, metadata or {}
+        notes = await self.create_notes_batch([{"content": content, "metadata": metadata}])
+        return notes[0] if notes else {}
+    
+    async def create_notes_batch(self, notes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create several notes in a single transaction
+        
+        Args:
+            notes: Dictionaries with content and optional metadata
+            
+        Returns:
+            List of the created notes, in input order
+        """
+        rows = [{"content": note["content"], "metadata": note.get("metadata") or {}} for note in notes]
+        if not rows:
+            return []
+        return await self._write(self._create_notes_tx, rows)
+    
+    async def _create_notes_tx(self, tx, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Transaction function for creating notes"""
+        notes = []
+        for batch in _batches(rows):
+            result = await tx.run(Q_CREATE_NOTES, rows=batch)
+            notes.extend([dict(record["n"]) async for record in result])
+        return notes
+    
+    async def create_note_with_links(self, content: str, metadata: Optional[Dict[str, Any]] = None,
+                                     links: Optional[List[Tuple[str, str, Optional[Dict[str, Any]]]]] = None) -> Dict[str, Any]:
+        """
+        Create a note and its outgoing relationships in a single transaction
+        
+        Args:
+            content: The content of the note
+            metadata: Optional metadata for the note
+            links: (target_id, relationship_type, properties) tuples to link the note to
+            
+        Returns:
+            Dictionary with the created note data
+        """
+        # Relationship types can't be parameterized, so links are grouped into
+        # one UNWIND per type
+        links_by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for target_id, relationship_type, properties in links or []:
+            links_by_type.setdefault(relationship_type, []).append(
+                {"target": target_id, "properties": properties or {}}
             )
-            return result
-    
-    def _create_note_tx(self, tx, content: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
-        """Transaction function for creating a note"""
-        query = """
-        CREATE (n:Note {
-            id: randomUUID(),
-            content: $content,
-            created_at: datetime(),
-            updated_at: datetime()
-        })
-        SET n += $metadata
-        RETURN n
-        """
-        result = tx.run(query, content=content, metadata=metadata)
-        record = result.single()
-        if record:
-            return dict(record["n"])
-        return {}
+            
+        async def work(tx) -> Dict[str, Any]:
+            notes = await self._create_notes_tx(tx, [{"content": content, "metadata": metadata or {}}])
+            note = notes[0]
+            for relationship_type, rows in links_by_type.items():
+                await self._bulk_create_relationships_tx(
+                    tx, relationship_type, [{"source": note["id"], **row} for row in rows]
+                )
+            return note
+            
+        return await self._write(work)
     
-    def get_note(self, note_id: str) -> Optional[Dict[str, Any]]:
+    async def get_note(self, note_id: str) -> Optional[Dict[str, Any]]:
         """Get a note by ID"""
-        with self.driver.session() as session:
-            result = session.read_transaction(self._get_note_tx, note_id)
-            return result
+        return await self._read(self._get_note_tx, note_id)
     
-    def _get_note_tx(self, tx, note_id: str) -> Optional[Dict[str, Any]]:
+    async def _get_note_tx(self, tx, note_id: str) -> Optional[Dict[str, Any]]:
         """Transaction function for getting a note"""
-        query = """
-        MATCH (n:Note {id: $note_id})
-        RETURN n
-        """
-        result = tx.run(query, note_id=note_id)
-        record = result.single()
+        result = await tx.run(Q_GET_NOTE, note_id=note_id)
+        record = await result.single()
         if record:
             return dict(record["n"])
         return None
     
-    def get_notes(self, limit: int = 10, skip: int = 0) -> List[Dict[str, Any]]:
-        """Get multiple notes with pagination"""
-        with self.driver.session() as session:
-            result = session.read_transaction(self._get_notes_tx, limit, skip)
-            return result
+    async def get_notes(self, limit: int = 10, skip: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get a page of note summaries
+        
+        Rows hold id, created_at, updated_at, and a content preview; use
+        get_note for the full note.
+        """
+        return await self._read(self._get_notes_tx, limit, skip)
     
-    def _get_notes_tx(self, tx, limit: int, skip: int) -> List[Dict[str, Any]]:
+    async def _get_notes_tx(self, tx, limit: int, skip: int) -> List[Dict[str, Any]]:
         """Transaction function for getting multiple notes"""
-        query = """
-        MATCH (n:Note)
-        RETURN n
-        ORDER BY n.created_at DESC
-        SKIP $skip
-        LIMIT $limit
-        """
-        result = tx.run(query, limit=limit, skip=skip)
-        return [dict(record["n"]) for record in result]
-    
-    def update_note(self, note_id: str, content: Optional[str] = None, 
-                   metadata: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
-        """Update a note by ID"""
-        with self.driver.session() as session:
-            result = session.write_transaction(
-                self._update_note_tx, note_id, content, metadata or {}
-            )
-            return result
+        result = await tx.run(Q_GET_NOTES, limit=limit, skip=skip, preview_length=_PREVIEW_LENGTH)
+        return [dict(record) async for record in result]
     
-    def _update_note_tx(self, tx, note_id: str, content: Optional[str], 
-                       metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Transaction function for updating a note"""
-        # Build dynamic SET clause
-        set_clauses = ["n.updated_at = datetime()"]
-        params = {"note_id": note_id, "metadata": metadata}
-        
-        if content is not None:
-            set_clauses.append("n.content = $content")
-            params["content"] = content
-            
-        for key in metadata:
-            set_clauses.append(f"n.{key} = $metadata.{key}")
-            
-        set_clause = ", ".join(set_clauses)
+    async def iter_notes(self, limit: int = 10, skip: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield notes one at a time as they arrive from the database
         
-        query = f"""
-        MATCH (n:Note {{id: $note_id}})
-        SET {set_clause}
-        RETURN n
+        Timestamps are returned as ISO strings so rows can be serialized directly.
+        The session stays open until the iterator is exhausted or closed.
         """
-        result = tx.run(query, **params)
-        record = result.single()
+        async with self.driver.session(database=self.database, default_access_mode=READ_ACCESS,
+                                       bookmark_manager=self._bookmarks) as session:
+            result = await session.run(Q_ITER_NOTES, limit=limit, skip=skip)
+            async for record in result:
+                yield record["n"]
+    
+    async def update_note(self, note_id: str, content: Optional[str] = None, 
+                         metadata: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Update a note by ID"""
+        return await self._write(
+            self._update_note_tx, note_id, content, metadata or {}
+        )
+    
+    async def _update_note_tx(self, tx, note_id: str, content: Optional[str], 
+                             metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Transaction function for updating a note"""
+        result = await tx.run(Q_UPDATE_NOTE, note_id=note_id, content=content, metadata=metadata)
+        record = await result.single()
         if record:
             return dict(record["n"])
         return None
     
-    def delete_note(self, note_id: str) -> bool:
+    async def delete_note(self, note_id: str) -> bool:
         """Delete a note by ID"""
-        with self.driver.session() as session:
-            result = session.write_transaction(self._delete_note_tx, note_id)
-            return result
+        return await self._write(self._delete_note_tx, note_id)
     
-    def _delete_note_tx(self, tx, note_id: str) -> bool:
+    async def _delete_note_tx(self, tx, note_id: str) -> bool:
         """Transaction function for deleting a note"""
-        query = """
-        MATCH (n:Note {id: $note_id})
-        DETACH DELETE n
-        RETURN count(n) as deleted_count
-        """
-        result = tx.run(query, note_id=note_id)
-        record = result.single()
+        result = await tx.run(Q_DELETE_NOTE, note_id=note_id)
+        record = await result.single()
         return record and record["deleted_count"] > 0
     
     # Concept operations
     
-    def create_concept(self, name: str, description: Optional[str] = None,
-                      categories: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Create a new concept in the graph database"""
-        with self.driver.session() as session:
-            result = session.write_transaction(
-                self._create_concept_tx, name, description, categories or []
-            )
-            return result
+    async def create_concept(self, name: str, description: Optional[str] = None,
+                            categories: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Create a concept in the graph database, or reuse the one with this name"""
+        return await self._write(
+            self._create_concept_tx, name, description, categories or []
+        )
     
-    def _create_concept_tx(self, tx, name: str, description: Optional[str],
-                          categories: List[str]) -> Dict[str, Any]:
+    async def _create_concept_tx(self, tx, name: str, description: Optional[str],
+                                categories: List[str]) -> Dict[str, Any]:
         """Transaction function for creating a concept"""
-        query = """
-        CREATE (c:Concept {
-            id: randomUUID(),
-            name: $name,
-            description: $description
-        })
-        RETURN c
-        """
-        result = tx.run(query, name=name, description=description)
-        record = result.single()
+        result = await tx.run(Q_CREATE_CONCEPT, name=name, description=description)
+        record = await result.single()
         concept = dict(record["c"])
         
         # Create relationships to categories if provided
         if categories:
-            for category in categories:
-                tx.run("""
-                MATCH (c:Concept {id: $concept_id})
-                MERGE (cat:Category {name: $category})
-                MERGE (c)-[:BELONGS_TO]->(cat)
-                """, concept_id=concept["id"], category=category)
+            result = await tx.run(Q_LINK_CATEGORIES, concept_id=concept["id"], categories=categories)
+            await result.consume()
         
         return concept
     
+    async def iter_concepts(self, limit: int = 10, skip: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield concepts with their category weights one at a time as they arrive
+        
+        The session stays open until the iterator is exhausted or closed.
+        """
+        async with self.driver.session(database=self.database, default_access_mode=READ_ACCESS,
+                                       bookmark_manager=self._bookmarks) as session:
+            result = await session.run(Q_ITER_CONCEPTS, limit=limit, skip=skip)
+            async for record in result:
+                yield {
+                    "id": record["id"],
+                    "name": record["name"],
+                    "description": record["description"],
+                    "categories": [{category["name"]: category["weight"]} for category in record["categories"]]
+                }
+    
+    async def bulk_create_concepts(self, names: List[str]) -> Dict[str, str]:
+        """
+        Get or create concepts by name in a single transaction
+        
+        Args:
+            names: Concept names (duplicates are ignored)
+            
+        Returns:
+            Dictionary mapping each concept name to its ID
+        """
+        rows = [{"name": name} for name in dict.fromkeys(names)]
+        if not rows:
+            return {}
+        return await self._write(self._bulk_create_concepts_tx, rows)
+    
+    async def _bulk_create_concepts_tx(self, tx, rows: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Transaction function for creating concepts in bulk"""
+        concept_ids = {}
+        for batch in _batches(rows):
+            result = await tx.run(Q_MERGE_CONCEPTS, rows=batch)
+            async for record in result:
+                concept_ids[record["name"]] = record["id"]
+        return concept_ids
+    
+    async def bulk_assign_categories(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Link concepts to categories in a single transaction
+        
+        Args:
+            rows: Dictionaries with concept_id, category (name), and weight
+        """
+        if not rows:
+            return
+        await self._write(self._bulk_assign_categories_tx, rows)
+    
+    async def _bulk_assign_categories_tx(self, tx, rows: List[Dict[str, Any]]) -> None:
+        """Transaction function for linking concepts to categories in bulk"""
+        for batch in _batches(rows):
+            result = await tx.run(Q_ASSIGN_CATEGORIES, rows=batch)
+            await result.consume()
+    
     # Relationship operations
     
-    def create_relationship(self, source_id: str, target_id: str, 
-                           relationship_type: str, properties: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Create a relationship between two nodes"""
-        with self.driver.session() as session:
-            result = session.write_transaction(
-                self._create_relationship_tx, source_id, target_id, relationship_type, properties or {}
-            )
-            return result
+    async def create_relationship(self, source_id: str, target_id: str, 
+                                 relationship_type: str, properties: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Create a relationship between two Note or Concept nodes
+        
+        An existing relationship of this type between the nodes is reused and
+        its properties updated. Returns an empty dictionary if either node is
+        not found.
+        """
+        return await self._write(
+            self._create_relationship_tx, source_id, target_id, relationship_type, properties or {}
+        )
     
-    def _create_relationship_tx(self, tx, source_id: str, target_id: str,
-                              relationship_type: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+    async def _create_relationship_tx(self, tx, source_id: str, target_id: str,
+                                    relationship_type: str, properties: Dict[str, Any]) -> Dict[str, Any]:
         """Transaction function for creating a relationship"""
-        # Determine node labels based on IDs
-        query = f"""
-        MATCH (source {{id: $source_id}}), (target {{id: $target_id}})
-        MERGE (source)-[r:{relationship_type} {{created_at: datetime()}}]->(target)
-        SET r += $properties
-        RETURN source, r, target
-        """
-        result = tx.run(query, source_id=source_id, target_id=target_id, properties=properties)
-        record = result.single()
+        query = _relationship_query(Q_CREATE_RELATIONSHIP, relationship_type)
+        result = await tx.run(query, source_id=source_id, target_id=target_id, properties=properties)
+        record = await result.single()
         if record:
             return {
                 "source": dict(record["source"]),
@@ -234,3 +531,29 @@ class GraphManager:
                 "target": dict(record["target"]),
             }
         return {}
+    
+    async def bulk_create_relationships(self, relationship_type: str, rows: List[Dict[str, Any]]) -> None:
+        """
+        Create relationships of one type between Note or Concept nodes in a single transaction
+        
+        Existing relationships are reused with their properties updated, and
+        rows whose nodes are not found are skipped.
+        
+        Args:
+            relationship_type: Type of every relationship created
+            rows: Dictionaries with source (ID), target (ID), and optional properties
+        """
+        if not rows:
+            return
+        rows = [
+            {"source": row["source"], "target": row["target"], "properties": row.get("properties") or {}}
+            for row in rows
+        ]
+        await self._write(self._bulk_create_relationships_tx, relationship_type, rows)
+    
+    async def _bulk_create_relationships_tx(self, tx, relationship_type: str, rows: List[Dict[str, Any]]) -> None:
+        """Transaction function for creating relationships in bulk"""
+        query = _relationship_query(Q_MERGE_RELATIONSHIPS, relationship_type)
+        for batch in _batches(rows):
+            result = await tx.run(query, rows=batch)
+            await result.consume()
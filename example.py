@@ -4,10 +4,12 @@ from openai import OpenAI
 if not os.path.exists(".env"):
     raise FileNotFoundError(".env file not found")
 
+# partition splits on the first "=" only, so values may contain "="
 with open(".env", "r") as f:
-    for line in f:
-        key, value = line.strip().split("=")
-        os.environ[key] = value
+    os.environ.update(
+        line.strip().partition("=")[::2] for line in f
+        if "=" in line and not line.lstrip().startswith("#")
+    )
 
 client = OpenAI(
   api_key=os.getenv("OPENAI_API_KEY")
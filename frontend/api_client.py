@@ -3,34 +3,50 @@ API Client
 
 This module provides a client for communicating with the Noterer backend API.
 """
-import aiohttp
+import orjson
 import asyncio
-import json
 from typing import Dict, List, Any, Optional, Union
 
+from frontend.services.http_session import SharedSession
+from frontend.services.ttl_cache import TTLCache
+
+# Bodies are pre-encoded with orjson, so the content type is set explicitly
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 class APIClient:
     """Client for the Noterer backend API"""
     
-    def __init__(self, base_url: str = "http://127.0.0.1:8000"):
+    def __init__(self, base_url: str = "http://127.0.0.1:8000",
+                 http_session: Optional[SharedSession] = None):
         """
         Initialize the API client
         
         Args:
             base_url: Base URL of the Noterer backend API
+            http_session: Shared HTTP session (a private one is created if omitted)
         """
         self.base_url = base_url
-        self.session = None
+        # An injected session belongs to whoever created it, and is left open on close
+        self._owns_session = http_session is None
+        self.http_session = http_session or SharedSession()
+        # Short-lived read caches so UI refreshes of the same data skip the
+        # network; list pages expire sooner since they change with every write
+        self._note_cache = TTLCache(maxsize=1024, ttl=5.0)
+        self._list_cache = TTLCache(maxsize=64, ttl=2.0)
         
-    async def _ensure_session(self) -> None:
-        """Ensure that an HTTP session exists"""
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
-            
     async def close(self) -> None:
+        """Close the HTTP session, if this client created it"""
+        if self._owns_session:
+            await self.http_session.close()
+        
+    async def __aenter__(self):
+        """Open the HTTP session up front"""
+        await self.http_session.get()
+        return self
+        
+    async def __aexit__(self, *exc_info) -> None:
         """Close the HTTP session"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        await self.close()
             
     async def _request(self, method: str, endpoint: str, 
                       data: Optional[Dict[str, Any]] = None,
@@ -47,20 +63,20 @@ class APIClient:
         Returns:
             Response data as a dictionary
         """
-        await self._ensure_session()
         url = f"{self.base_url}{endpoint}"
         
         try:
-            async with self.session.request(
+            async with self.http_session.session.request(
                 method=method,
                 url=url,
-                json=data,
+                data=orjson.dumps(data) if data is not None else None,
+                headers=_JSON_HEADERS if data is not None else None,
                 params=params
             ) as response:
                 if response.status == 204:  # No content
                     return {}
                     
-                response_data = await response.json()
+                response_data = orjson.loads(await response.read())
                 if not response.ok:
                     error_msg = response_data.get("detail", "Unknown error")
                     raise Exception(f"API Error ({response.status}): {error_msg}")
@@ -79,15 +95,67 @@ class APIClient:
         data = {"content": content}
         if tags:
             data["tags"] = tags
-        return await self._request("POST", "/notes/", data=data)
+        result = await self._request("POST", "/notes/", data=data)
+        self._list_cache.clear()
+        return result
+        
+    async def create_note_with_ai(self, content: str, tags: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Create a note and link it to its AI-extracted concepts and categories
+        
+        One request in place of process_note followed by create_note.
+        
+        Returns:
+            Dictionary with the created note, concepts, categories, and relationships
+        """
+        data = {"content": content}
+        if tags:
+            data["tags"] = tags
+        result = await self._request("POST", "/notes/with-ai", data=data)
+        self._list_cache.clear()
+        return result
         
     async def get_notes(self, limit: int = 10, skip: int = 0) -> List[Dict[str, Any]]:
         """Get all notes with pagination"""
-        return await self._request("GET", "/notes/", params={"limit": limit, "skip": skip})
+        key = (limit, skip)
+        notes = self._list_cache.get(key)
+        if notes is None:
+            notes = await self._request("GET", "/notes/", params={"limit": limit, "skip": skip})
+            if "error" not in notes:
+                self._list_cache.set(key, notes)
+        return notes
         
     async def get_note(self, note_id: str) -> Dict[str, Any]:
         """Get a specific note by ID"""
-        return await self._request("GET", f"/notes/{note_id}")
+        note = self._note_cache.get(note_id)
+        if note is None:
+            note = await self._request("GET", f"/notes/{note_id}")
+            if "error" not in note:
+                self._note_cache.set(note_id, note)
+        return note
+        
+    async def get_notes_bulk(self, ids: List[str], concurrency: int = 16) -> List[Dict[str, Any]]:
+        """
+        Get several notes by ID concurrently
+        
+        Prefer this over awaiting get_note in a loop: requests are fanned out
+        over the shared connection pool, with at most `concurrency` in flight,
+        so N notes cost about N / concurrency round-trips instead of N.
+        
+        Args:
+            ids: IDs of the notes to fetch
+            concurrency: Maximum number of requests in flight at once
+            
+        Returns:
+            Note data for each ID, in order (error dictionaries for failed fetches)
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def fetch(note_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.get_note(note_id)
+                
+        return await asyncio.gather(*(fetch(note_id) for note_id in ids))
         
     async def update_note(self, note_id: str, content: Optional[str] = None, 
                          tags: Optional[List[str]] = None) -> Dict[str, Any]:
@@ -97,11 +165,20 @@ class APIClient:
             data["content"] = content
         if tags is not None:
             data["tags"] = tags
-        return await self._request("PUT", f"/notes/{note_id}", data=data)
+        result = await self._request("PUT", f"/notes/{note_id}", data=data)
+        self._invalidate_note(note_id)
+        return result
         
     async def delete_note(self, note_id: str) -> Dict[str, Any]:
         """Delete a note"""
-        return await self._request("DELETE", f"/notes/{note_id}")
+        result = await self._request("DELETE", f"/notes/{note_id}")
+        self._invalidate_note(note_id)
+        return result
+        
+    def _invalidate_note(self, note_id: str) -> None:
+        """Drop cached reads that may contain a changed note"""
+        self._note_cache.pop(note_id)
+        self._list_cache.clear()
         
     # AI-related API methods
     
@@ -119,3 +196,7 @@ class APIClient:
     async def process_note(self, note_content: str) -> Dict[str, Any]:
         """Process a note with AI to extract concepts and categories"""
         return await self._request("POST", "/ai/process-note", data={"content": note_content})
+        
+    async def batch(self, operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run several AI operations in one request; results come back in order"""
+        return await self._request("POST", "/ai/batch", data={"operations": operations})
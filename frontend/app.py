@@ -10,6 +10,7 @@ from typing import Optional
 
 from frontend.views.main_window import MainWindow
 from frontend.api_client import APIClient
+from frontend.services.async_runtime import AsyncRuntime
 
 class NotererApp:
     """Main Noterer application class"""
@@ -20,8 +21,10 @@ class NotererApp:
         ctk.set_appearance_mode("System")  # Options: "System", "Dark", "Light"
         ctk.set_default_color_theme("blue")  # Options: "blue", "green", "dark-blue"
         
-        # Configure backend API client
-        self.api_client = APIClient(base_url="http://127.0.0.1:8000")
+        # One background event loop runs all network I/O, and its HTTP
+        # connection pool serves every backend client
+        self.runtime = AsyncRuntime()
+        self.api_client = APIClient(base_url="http://127.0.0.1:8000", http_session=self.runtime.http_session)
         
         # Create the main application window
         self.root = ctk.CTk()
@@ -35,7 +38,7 @@ class NotererApp:
             self.root.iconphoto(True, ctk.CTkImage(icon_path))
         
         # Create the main window with all UI components
-        self.main_window = MainWindow(self.root, self.api_client)
+        self.main_window = MainWindow(self.root, self.api_client, self.runtime)
         
     def run(self):
         """Run the application main loop"""
@@ -0,0 +1,61 @@
+"""
+Async Runtime
+
+This module provides the application-wide event loop. It runs on a
+background thread so that network I/O never blocks the Tk main loop, and it
+owns the HTTP session every backend client shares. That session is bound to
+this loop, so client coroutines must be scheduled with submit or submit_ui
+rather than run on a loop of their own.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Coroutine, Optional
+
+from frontend.services.http_session import SharedSession
+
+class AsyncRuntime:
+    """Long-lived event loop on a background thread, shared by the whole UI"""
+    
+    def __init__(self, http_session: Optional[SharedSession] = None):
+        """
+        Start the event loop thread
+        
+        Args:
+            http_session: HTTP session to share between clients (one is created if omitted)
+        """
+        self.http_session = http_session or SharedSession()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="async-runtime", daemon=True)
+        self._thread.start()
+        # Opened up front on the loop, so clients can use it without checking per request
+        self.submit(self.http_session.get()).result()
+        
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on the loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+        
+    def submit_ui(self, widget, coro: Coroutine, callback: Callable[[Future], Any]) -> Future:
+        """
+        Schedule a coroutine, then pass its future to callback on the Tk thread
+        
+        Args:
+            widget: Any widget of the Tk application, used to hop back to its thread
+            coro: Coroutine to run on the loop
+            callback: Called with the finished future; free to update widgets
+        """
+        future = self.submit(coro)
+        # Widgets may only be touched from the Tk thread
+        future.add_done_callback(lambda f: widget.after(0, callback, f))
+        return future
+        
+    def stop(self, timeout: float = 5.0) -> None:
+        """Close the shared HTTP session, then stop the loop and its thread"""
+        if not self.loop.is_running():
+            return
+            
+        try:
+            self.submit(self.http_session.close()).result(timeout=timeout)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=timeout)
@@ -4,33 +4,48 @@ Conversation Service
 This module provides services for interacting with the Conversation API
 and implementing the confirmation-driven flow in the frontend.
 """
-import aiohttp
+import asyncio
+import orjson
 from typing import Dict, Any, Optional
 
+from frontend.services.http_session import SharedSession
+
+# Bodies are pre-encoded with orjson, so the content type is set explicitly
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 class ConversationService:
     """Service for conversation-based interactions with the backend"""
     
-    def __init__(self, base_url: str = "http://127.0.0.1:8000"):
+    def __init__(self, base_url: str = "http://127.0.0.1:8000",
+                 http_session: Optional[SharedSession] = None):
         """
         Initialize the conversation service
         
         Args:
             base_url: Base URL of the backend API
+            http_session: Shared HTTP session (a private one is created if omitted)
         """
         self.base_url = base_url
-        self.session = None
+        # An injected session belongs to whoever created it, and is left open on close
+        self._owns_session = http_session is None
+        self.http_session = http_session or SharedSession()
         self.active_conversation_id = None
+        # In-flight start shared by concurrent ensure_conversation callers
+        self._starting: Optional[asyncio.Future] = None
         
-    async def _ensure_session(self) -> None:
-        """Ensure that an HTTP session exists"""
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
-    
     async def close(self) -> None:
+        """Close the HTTP session, if this service created it"""
+        if self._owns_session:
+            await self.http_session.close()
+    
+    async def __aenter__(self):
+        """Open the HTTP session up front"""
+        await self.http_session.get()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
         """Close the HTTP session"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        await self.close()
     
     async def _request(self, method: str, endpoint: str, 
                       data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -45,16 +60,16 @@ class ConversationService:
         Returns:
             Response data as a dictionary
         """
-        await self._ensure_session()
         url = f"{self.base_url}{endpoint}"
         
         try:
-            async with self.session.request(
+            async with self.http_session.session.request(
                 method=method,
                 url=url,
-                json=data
+                data=orjson.dumps(data) if data is not None else None,
+                headers=_JSON_HEADERS if data is not None else None
             ) as response:
-                response_data = await response.json()
+                response_data = orjson.loads(await response.read())
                 if not response.ok:
                     error_msg = response_data.get("detail", "Unknown error")
                     raise Exception(f"API Error ({response.status}): {error_msg}")
@@ -77,6 +92,24 @@ class ConversationService:
             self.active_conversation_id = result["conversation_id"]
         return result
     
+    async def ensure_conversation(self) -> Dict[str, Any]:
+        """
+        Get the active conversation, starting one if there is none
+        
+        Concurrent callers share a single start request, so prefetching a
+        conversation never races the view into starting a second one.
+        
+        Returns:
+            Dictionary with the conversation ID, or an error
+        """
+        if self.active_conversation_id:
+            return {"conversation_id": self.active_conversation_id}
+            
+        if self._starting is None:
+            self._starting = asyncio.ensure_future(self.start_conversation())
+            self._starting.add_done_callback(lambda _: setattr(self, "_starting", None))
+        return await asyncio.shield(self._starting)
+    
     async def send_message(self, message: str, 
                          include_graph_context: bool = True) -> Dict[str, Any]:
         """
@@ -90,7 +123,7 @@ class ConversationService:
             Dictionary with the AI response and proposed actions
         """
         if not self.active_conversation_id:
-            await self.start_conversation()
+            await self.ensure_conversation()
             
         data = {
             "text": message,
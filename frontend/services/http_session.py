@@ -0,0 +1,72 @@
+"""
+HTTP Session
+
+This module provides a shared aiohttp session so that every backend client
+in the application draws from one tuned connection pool.
+"""
+import asyncio
+import aiohttp
+import orjson
+from typing import Optional
+
+class SharedSession:
+    """Lazily created aiohttp session shared between API clients"""
+    
+    def __init__(self, limit: int = 200, limit_per_host: int = 64,
+                 keepalive_timeout: float = 60, total_timeout: float = 30):
+        """
+        Initialize the shared session settings
+        
+        Args:
+            limit: Maximum number of open connections
+            limit_per_host: Maximum number of open connections to one host
+            keepalive_timeout: Seconds an idle connection is kept for reuse
+            total_timeout: Seconds before a request is abandoned
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.total_timeout = total_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+    async def get(self) -> aiohttp.ClientSession:
+        """Get the session, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        # A session is bound to the loop it was created on, so one created on a
+        # loop that has since been replaced is discarded
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.total_timeout),
+                # For any json= bodies; aiohttp expects the serializer to return str
+                json_serialize=lambda obj: orjson.dumps(obj).decode()
+            )
+            self._loop = loop
+        return self._session
+        
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        The open session, for requests made on the loop it was opened on
+        
+        AsyncRuntime opens it when it starts and entering a client opens it
+        too, so requests skip the per-call lazy creation check in get().
+        """
+        if self._session is None or self._session.closed:
+            raise RuntimeError("HTTP session is not open; run the client on an AsyncRuntime or enter it with async with")
+        return self._session
+        
+    async def close(self) -> None:
+        """Close the session and its connection pool"""
+        if self._session is not None:
+            if self._loop is asyncio.get_running_loop():
+                await self._session.close()
+            self._session = None
+            self._loop = None
@@ -0,0 +1,53 @@
+"""
+TTL Cache
+
+This module provides a small LRU cache whose entries expire after a fixed
+time, used to absorb repeated backend lookups from UI refreshes.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+class TTLCache:
+    """Size-bounded LRU cache with per-cache expiry"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 5.0):
+        """
+        Initialize the cache
+        
+        Args:
+            maxsize: Maximum number of entries kept
+            ttl: Seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a live entry, or None if it is missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+            
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+            
+        self._entries.move_to_end(key)
+        return value
+        
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store an entry, evicting the least recently used one if full"""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            
+    def pop(self, key: Hashable) -> None:
+        """Drop an entry if present"""
+        self._entries.pop(key, None)
+        
+    def clear(self) -> None:
+        """Drop every entry"""
+        self._entries.clear()
@@ -5,29 +5,63 @@ This module provides a UI component for conversation-based interactions
 with the AI using the confirmation-driven flow.
 """
 import customtkinter as ctk
-import asyncio
-from typing import Optional
+import tkinter as tk
+from collections import Counter
+from concurrent.futures import Future
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, Optional
 
+from frontend.services.async_runtime import AsyncRuntime
 from frontend.services.conversation_service import ConversationService
 
+# Proposed action descriptions by action type, for the confirmation prompt
+_ACTION_FORMATTERS: Dict[str, Callable[[int, Dict[str, Any]], str]] = {
+    "create_note": lambda i, action: f"{i+1}. Create a new note with content: '{action.get('content', '...')}'",
+    "create_concept": lambda i, action: f"{i+1}. Create a new concept: '{action.get('name', '...')}'",
+    "create_relationship": lambda i, action: (
+        f"{i+1}. Create a relationship between '{action.get('source', '...')}' and '{action.get('target', '...')}'"
+    ),
+}
+
+@lru_cache(maxsize=64)
+def _humanize(action_type: str) -> str:
+    """Turn an action type such as link_notes into readable text (Link notes)"""
+    return action_type.replace("_", " ").capitalize()
+
+def _format_other_action(i: int, action: Dict[str, Any]) -> str:
+    """Describe an action type without a dedicated formatter"""
+    return f"{i+1}. {_humanize(action.get('type', 'unknown'))}"
+
 class ConversationView(ctk.CTkFrame):
     """UI component for conversation-based interactions with the AI"""
     
-    def __init__(self, parent, conversation_service: Optional[ConversationService] = None):
+    def __init__(self, parent, conversation_service: Optional[ConversationService] = None,
+                 runtime: Optional[AsyncRuntime] = None):
         """
         Initialize the conversation view
         
         Args:
             parent: Parent widget
             conversation_service: Optional ConversationService instance
+            runtime: Shared async runtime to do network I/O on (a private one is started if omitted)
         """
         super().__init__(parent)
         
+        # Network calls run on the runtime's background loop, so the Tk main
+        # loop stays responsive
+        self._owns_runtime = runtime is None
+        self.runtime = runtime or AsyncRuntime()
+        
         # Initialize service
-        self.conversation_service = conversation_service or ConversationService()
+        self.conversation_service = conversation_service or ConversationService(
+            http_session=self.runtime.http_session
+        )
         self.conversation_active = False
         self.awaiting_confirmation = False
         self.proposed_actions = []
+        # Chat messages waiting to be written by the next idle flush
+        self._chat_buffer = []
+        self._chat_flush_pending = False
         
         # Configure grid
         self.grid_columnconfigure(0, weight=1)
@@ -38,8 +72,8 @@ class ConversationView(ctk.CTkFrame):
         self._create_input_area()
         self._create_confirmation_area()
         
-        # Initialize conversation
-        self.after(100, self._start_conversation)
+        # Initialize conversation; cancelled by on_close if it hasn't fired yet
+        self._start_after_id = self.after(100, self._start_conversation)
         
     def _create_chat_area(self):
         """Create the chat history display area"""
@@ -56,6 +90,11 @@ class ConversationView(ctk.CTkFrame):
         self.chat_display.grid(row=0, column=0, sticky="nsew", padx=0, pady=0)
         self.chat_display.configure(state="disabled")
         
+        # Sender tag styles never change, so they are configured once here
+        self.chat_display.tag_configure("user_tag", foreground="#007bff", font=("TkDefaultFont", 12, "bold"))
+        self.chat_display.tag_configure("ai_tag", foreground="#28a745", font=("TkDefaultFont", 12, "bold"))
+        self.chat_display.tag_configure("system_tag", foreground="#6c757d", font=("TkDefaultFont", 12, "bold"))
+        
         # Welcome message
         self._add_to_chat("System", "Welcome to Noterer! I'm your AI assistant. I'll help you take notes and organize your thoughts.")
         
@@ -101,7 +140,7 @@ class ConversationView(ctk.CTkFrame):
             text="Confirm",
             fg_color="green",
             width=100,
-            command=lambda: self._handle_confirmation(True)
+            command=partial(self._handle_confirmation, True)
         )
         self.confirm_btn.grid(row=1, column=0, sticky="e", padx=(0, 5), pady=10)
         
@@ -110,17 +149,22 @@ class ConversationView(ctk.CTkFrame):
             text="Reject",
             fg_color="red",
             width=100,
-            command=lambda: self._handle_confirmation(False)
+            command=partial(self._handle_confirmation, False)
         )
         self.reject_btn.grid(row=1, column=1, sticky="w", padx=(5, 0), pady=10)
         
         # Initially hide confirmation area
         self.confirmation_frame.grid_remove()
         
-    async def _start_conversation_async(self):
-        """Start a new conversation asynchronously"""
+    def _start_conversation(self):
+        """Start a new conversation (UI callback)"""
+        self._start_after_id = None
+        self.runtime.submit_ui(self, self.conversation_service.ensure_conversation(), self._on_conversation_started)
+        
+    def _on_conversation_started(self, future: Future):
+        """Show the outcome of starting a conversation"""
         try:
-            result = await self.conversation_service.start_conversation()
+            result = future.result()
             self.conversation_active = "conversation_id" in result
             if self.conversation_active:
                 self._add_to_chat("System", "Conversation started. How can I help you today?")
@@ -128,28 +172,33 @@ class ConversationView(ctk.CTkFrame):
                 self._add_to_chat("System", "Failed to start conversation. Please try again.")
         except Exception as e:
             self._add_to_chat("System", f"Error starting conversation: {str(e)}")
-    
-    def _start_conversation(self):
-        """Start a new conversation (UI callback)"""
-        asyncio.run(self._start_conversation_async())
         
     def _add_to_chat(self, sender: str, message: str):
         """Add a message to the chat display"""
+        # Messages are buffered and written together once Tk is idle, so a
+        # burst of messages costs one unlock, scroll, and relayout
+        self._chat_buffer.append((sender, message))
+        if not self._chat_flush_pending:
+            self._chat_flush_pending = True
+            self.after_idle(self._flush_chat)
+            
+    def _flush_chat(self):
+        """Write buffered messages to the chat display"""
+        self._chat_flush_pending = False
         self.chat_display.configure(state="normal")
         
-        # Format based on sender
-        if sender.lower() == "user":
-            self.chat_display.insert("end", "You: ", "user_tag")
-            self.chat_display.tag_configure("user_tag", foreground="#007bff", font=("TkDefaultFont", 12, "bold"))
-        elif sender.lower() == "ai":
-            self.chat_display.insert("end", "AI: ", "ai_tag")
-            self.chat_display.tag_configure("ai_tag", foreground="#28a745", font=("TkDefaultFont", 12, "bold"))
-        else:
-            self.chat_display.insert("end", f"{sender}: ", "system_tag")
-            self.chat_display.tag_configure("system_tag", foreground="#6c757d", font=("TkDefaultFont", 12, "bold"))
-            
-        # Add the message and a newline
-        self.chat_display.insert("end", f"{message}\n\n")
+        for sender, message in self._chat_buffer:
+            # Format based on sender
+            if sender.lower() == "user":
+                self.chat_display.insert("end", "You: ", "user_tag")
+            elif sender.lower() == "ai":
+                self.chat_display.insert("end", "AI: ", "ai_tag")
+            else:
+                self.chat_display.insert("end", f"{sender}: ", "system_tag")
+                
+            # Add the message and a newline
+            self.chat_display.insert("end", f"{message}\n\n")
+        self._chat_buffer.clear()
         
         # Scroll to the bottom
         self.chat_display.see("end")
@@ -166,8 +215,8 @@ class ConversationView(ctk.CTkFrame):
         """Clear the user input field"""
         self.user_input.delete("1.0", "end")
         
-    async def _send_message_async(self):
-        """Send a message asynchronously"""
+    def _send_message(self):
+        """Send a message (UI callback)"""
         # Get user input
         message = self.user_input.get("1.0", "end").strip()
         if not message:
@@ -183,9 +232,13 @@ class ConversationView(ctk.CTkFrame):
         self.user_input.configure(state="disabled")
         self.send_btn.configure(state="disabled")
         
+        # Send message to service
+        self.runtime.submit_ui(self, self.conversation_service.send_message(message), self._on_message_response)
+        
+    def _on_message_response(self, future: Future):
+        """Show the AI response to a sent message"""
         try:
-            # Send message to service
-            result = await self.conversation_service.send_message(message)
+            result = future.result()
             
             # Add AI response to chat
             if "response" in result:
@@ -198,20 +251,13 @@ class ConversationView(ctk.CTkFrame):
                 self.proposed_actions = result.get("proposed_actions", [])
                 
                 # Format actions for display
-                action_text = "I'd like to make the following changes:\n\n"
+                parts = ["I'd like to make the following changes:", ""]
                 for i, action in enumerate(self.proposed_actions):
-                    action_type = action.get("type", "unknown")
-                    if action_type == "create_note":
-                        action_text += f"{i+1}. Create a new note with content: '{action.get('content', '...')}'\n"
-                    elif action_type == "create_concept":
-                        action_text += f"{i+1}. Create a new concept: '{action.get('name', '...')}'\n"
-                    elif action_type == "create_relationship":
-                        action_text += f"{i+1}. Create a relationship between '{action.get('source', '...')}' and '{action.get('target', '...')}'\n"
-                    else:
-                        action_text += f"{i+1}. {action_type.replace('_', ' ').capitalize()}\n"
-                
-                action_text += "\nWould you like me to proceed with these changes?"
-                self._update_action_display(action_text)
+                    parts.append(_ACTION_FORMATTERS.get(action.get("type"), _format_other_action)(i, action))
+                        
+                parts.append("")
+                parts.append("Would you like me to proceed with these changes?")
+                self._update_action_display("\n".join(parts))
                 self.confirmation_frame.grid()
                 
                 # Keep input disabled until confirmation
@@ -225,16 +271,19 @@ class ConversationView(ctk.CTkFrame):
             if not self.awaiting_confirmation:
                 self.user_input.configure(state="normal")
                 self.send_btn.configure(state="normal")
-    
-    def _send_message(self):
-        """Send a message (UI callback)"""
-        asyncio.run(self._send_message_async())
+                
+    def _handle_confirmation(self, confirmed: bool):
+        """Handle confirmation response (UI callback)"""
+        # Process confirmation
+        self.runtime.submit_ui(self, 
+            self.conversation_service.confirm_actions(confirmed),
+            lambda future: self._on_confirmation_result(future, confirmed)
+        )
         
-    async def _handle_confirmation_async(self, confirmed: bool):
-        """Handle confirmation response asynchronously"""
+    def _on_confirmation_result(self, future: Future, confirmed: bool):
+        """Show the outcome of a confirmation"""
         try:
-            # Process confirmation
-            result = await self.conversation_service.confirm_actions(confirmed)
+            result = future.result()
             
             # Add system message to chat
             if confirmed:
@@ -243,8 +292,9 @@ class ConversationView(ctk.CTkFrame):
                 # Add details about executed actions if available
                 if "executed_actions" in result and result["executed_actions"]:
                     executed = result["executed_actions"]
-                    success_count = sum(1 for a in executed if a.get("status") == "executed")
-                    fail_count = sum(1 for a in executed if a.get("status") == "failed")
+                    counts = Counter(a.get("status") for a in executed)
+                    success_count = counts["executed"]
+                    fail_count = counts["failed"]
                     
                     if fail_count > 0:
                         self._add_to_chat("System", f"Successfully executed {success_count} actions. {fail_count} actions failed.")
@@ -268,15 +318,24 @@ class ConversationView(ctk.CTkFrame):
             self.user_input.configure(state="normal")
             self.send_btn.configure(state="normal")
             
-    def _handle_confirmation(self, confirmed: bool):
-        """Handle confirmation response (UI callback)"""
-        asyncio.run(self._handle_confirmation_async(confirmed))
-        
     def on_close(self):
         """Clean up resources when the view is closed"""
-        # End the conversation if active
-        if self.conversation_active:
-            asyncio.run(self.conversation_service.end_conversation())
+        if self._start_after_id is not None:
+            try:
+                self.after_cancel(self._start_after_id)
+            except tk.TclError:
+                pass
+            self._start_after_id = None
             
-        # Close the session
-        asyncio.run(self.conversation_service.close())
+        # End the conversation if active; waited on so it finishes before exit.
+        # It has to complete before the session closes, so the two aren't overlapped
+        if self.conversation_active:
+            try:
+                self.runtime.submit(self.conversation_service.end_conversation()).result(timeout=5)
+            except (TimeoutError, ValueError):
+                # An unreachable backend expires the conversation itself
+                pass
+                
+        # The shared session is closed by whoever owns the runtime
+        if self._owns_runtime:
+            self.runtime.stop()
@@ -6,28 +6,47 @@ This module provides the main window UI for the Noterer application.
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
-import asyncio
-from typing import Dict, Any
+from concurrent.futures import Future
+from functools import partial
+from typing import Dict, List, Any, Optional
 
 from frontend.api_client import APIClient
+from frontend.services.async_runtime import AsyncRuntime
 from frontend.views.note_editor import NoteEditor
 from frontend.views.conversation_view import ConversationView
 from frontend.services.conversation_service import ConversationService
 
+# Row height assumed until the first row is measured
+_DEFAULT_ROW_HEIGHT = 40
+
+# Rows moved per mouse wheel step
+_WHEEL_ROWS = 3
+
 class MainWindow:
     """Main window UI for the Noterer application"""
     
-    def __init__(self, root: ctk.CTk, api_client: APIClient):
+    def __init__(self, root: ctk.CTk, api_client: APIClient, runtime: Optional[AsyncRuntime] = None):
         """
         Initialize the main window
         
         Args:
             root: The root CTk window
             api_client: API client for backend communication
+            runtime: Async runtime that runs network I/O (created if omitted)
         """
         self.root = root
         self.api_client = api_client
+        # Network calls run on the runtime's background loop, so the Tk main
+        # loop never blocks on I/O
+        self.runtime = runtime or AsyncRuntime(self.api_client.http_session)
         self.notes_data = []  # Store loaded notes data
+        self._note_rows = []  # (frame, button) widgets reused across refreshes
+        self._row_texts = []  # Text each row is currently showing
+        self._search_after_id = None  # Pending debounced search
+        self._shown_notes = []  # Filtered notes the list scrolls over
+        self._notes_offset = 0  # Index of the first note shown
+        self._visible_rows = 1  # Rows that fit in the list
+        self._selecting_id = None  # Note whose full data is being fetched
         
         # Configure root grid
         self.root.grid_columnconfigure(0, weight=1)
@@ -43,7 +62,10 @@ class MainWindow:
         self.main_frame.grid_rowconfigure(0, weight=1)
         
         # Initialize services
-        self.conversation_service = ConversationService(base_url="http://127.0.0.1:8000")
+        self.conversation_service = ConversationService(
+            base_url="http://127.0.0.1:8000",
+            http_session=self.runtime.http_session
+        )
         
         # Create UI components
         self._create_sidebar()
@@ -78,6 +100,7 @@ class MainWindow:
         
         self.search_entry = ctk.CTkEntry(self.search_frame, placeholder_text="Search notes...")
         self.search_entry.grid(row=0, column=0, sticky="ew", padx=5, pady=5)
+        self.search_entry.bind("<KeyRelease>", self._on_search_change)
         
         # Notes list
         self.notes_list_frame = ctk.CTkFrame(self.sidebar)
@@ -85,10 +108,16 @@ class MainWindow:
         self.notes_list_frame.grid_rowconfigure(0, weight=1)
         self.notes_list_frame.grid_columnconfigure(0, weight=1)
         
-        # Scrollable notes list
-        self.notes_list = ctk.CTkScrollableFrame(self.notes_list_frame)
+        # Virtualized notes list: only rows that fit are created, and scrolling
+        # moves the window of notes they show
+        self.notes_list = ctk.CTkFrame(self.notes_list_frame)
         self.notes_list.grid(row=0, column=0, sticky="nsew", padx=0, pady=0)
         self.notes_list.grid_columnconfigure(0, weight=1)
+        self.notes_list.bind("<Configure>", self._on_notes_list_resize)
+        self._bind_notes_wheel(self.notes_list)
+        
+        self.notes_scrollbar = ctk.CTkScrollbar(self.notes_list_frame, command=self._on_notes_scroll)
+        self.notes_scrollbar.grid(row=0, column=1, sticky="ns", padx=0, pady=0)
         
     def _create_content_area(self):
         """Create the main content area with tabs"""
@@ -96,133 +125,242 @@ class MainWindow:
         self.content_area = ctk.CTkFrame(self.main_frame)
         self.content_area.grid(row=0, column=1, sticky="nsew", padx=(5, 0), pady=0)
         self.content_area.grid_columnconfigure(0, weight=1)
-        self.content_area.grid_rowconfigure(0, weight=0)  # Tab bar
-        self.content_area.grid_rowconfigure(1, weight=1)  # Content
-        
-        # Create tab control
-        self.tab_frame = ctk.CTkFrame(self.content_area)
-        self.tab_frame.grid(row=0, column=0, sticky="ew", padx=0, pady=0)
-        
-        self.tab_note = ctk.CTkButton(
-            self.tab_frame,
-            text="Notes",
-            command=self._switch_to_notes_tab,
-            fg_color="transparent",
-            text_color=("gray10", "gray90"),
-            hover_color=("gray70", "gray30"),
-            corner_radius=0,
-            border_spacing=10
-        )
-        self.tab_note.grid(row=0, column=0, sticky="w", padx=0, pady=0)
-        
-        self.tab_conversation = ctk.CTkButton(
-            self.tab_frame,
-            text="Conversation",
-            command=self._switch_to_conversation_tab,
-            fg_color="transparent",
-            text_color=("gray10", "gray90"),
-            hover_color=("gray70", "gray30"),
-            corner_radius=0,
-            border_spacing=10
-        )
-        self.tab_conversation.grid(row=0, column=1, sticky="w", padx=0, pady=0)
+        self.content_area.grid_rowconfigure(0, weight=1)
+        
+        # Create tab control; switching tabs raises the stacked tab frame
+        # instead of regridding it
+        self.tabs = ctk.CTkTabview(self.content_area, command=self._on_tab_change)
+        self.tabs.grid(row=0, column=0, sticky="nsew", padx=0, pady=0)
         
-        # Create content frames for each tab
         # Note editor tab
-        self.note_frame = ctk.CTkFrame(self.content_area)
-        self.note_frame.grid(row=1, column=0, sticky="nsew", padx=0, pady=0)
+        self.note_frame = self.tabs.add("Notes")
         self.note_frame.grid_columnconfigure(0, weight=1)
         self.note_frame.grid_rowconfigure(0, weight=1)
         
-        self.note_editor = NoteEditor(self.note_frame, self.api_client)
+        self.note_editor = NoteEditor(self.note_frame, self.api_client, runtime=self.runtime)
         self.note_editor.grid(row=0, column=0, sticky="nsew", padx=0, pady=0)
         
         # Conversation tab
-        self.conversation_frame = ctk.CTkFrame(self.content_area)
-        self.conversation_frame.grid(row=1, column=0, sticky="nsew", padx=0, pady=0)
+        self.conversation_frame = self.tabs.add("Conversation")
         self.conversation_frame.grid_columnconfigure(0, weight=1)
         self.conversation_frame.grid_rowconfigure(0, weight=1)
         
-        self.conversation_view = ConversationView(self.conversation_frame, self.conversation_service)
-        self.conversation_view.grid(row=0, column=0, sticky="nsew", padx=0, pady=0)
+        # Built when the tab is first shown, since it starts a conversation
+        self.conversation_view = None
         
         # Start with notes tab active
-        self._switch_to_notes_tab()
-        
-    def _switch_to_notes_tab(self):
-        """Switch to the notes tab"""
-        self.tab_note.configure(fg_color=("gray75", "gray25"))
-        self.tab_conversation.configure(fg_color="transparent")
-        self.conversation_frame.grid_remove()
-        self.note_frame.grid()
-        
-    def _switch_to_conversation_tab(self):
-        """Switch to the conversation tab"""
-        self.tab_conversation.configure(fg_color=("gray75", "gray25"))
-        self.tab_note.configure(fg_color="transparent")
-        self.note_frame.grid_remove()
-        self.conversation_frame.grid()
-        
-    async def _load_notes(self):
+        self.tabs.set("Notes")
+        
+    def _on_tab_change(self):
+        """Build the conversation view the first time its tab is shown"""
+        if self.tabs.get() == "Conversation" and self.conversation_view is None:
+            self.conversation_view = ConversationView(self.conversation_frame, self.conversation_service, runtime=self.runtime)
+            self.conversation_view.grid(row=0, column=0, sticky="nsew", padx=0, pady=0)
+            
+    def _load_notes(self):
         """Load notes from the backend API"""
+        self.runtime.submit_ui(self.root, self.api_client.get_notes(limit=20, skip=0), self._on_notes_loaded)
+        
+    def _on_notes_loaded(self, future: Future):
+        """Show loaded notes, or the error that prevented loading them"""
         try:
-            self.notes_data = await self.api_client.get_notes(limit=20, skip=0)
-            self._populate_notes_list()
+            notes = future.result()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load notes: {str(e)}")
+            return
             
+        if isinstance(notes, dict) and "error" in notes:
+            messagebox.showerror("Error", f"Failed to load notes: {notes['error']}")
+            return
+            
+        # Display strings are worked out once per note rather than on every refresh
+        for note in notes:
+            self._display_text(note)
+        self.notes_data = notes
+        self._populate_notes_list()
+            
+    def _on_search_change(self, event=None):
+        """Re-filter the notes list once typing pauses"""
+        # Only the last keystroke in a burst triggers a refilter
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+        self._search_after_id = self.root.after(150, self._apply_search)
+        
+    def _apply_search(self):
+        """Filter the notes list by the search text"""
+        self._search_after_id = None
+        self._notes_offset = 0
+        self._populate_notes_list()
+        
+    def _filtered_notes(self) -> List[Dict[str, Any]]:
+        """Get the loaded notes matching the search text"""
+        query = self.search_entry.get().strip().lower()
+        if not query:
+            return self.notes_data
+        return [
+            note for note in self.notes_data
+            if query in (note.get("preview") or note.get("content", "")).lower()
+        ]
+        
+    @staticmethod
+    def _display_text(note: Dict[str, Any]) -> str:
+        """Get the truncated list text for a note, cached on the note"""
+        # List rows may only carry a preview
+        source = note.get("preview") or note.get("content", "")
+        if note.get("_display_src") != source:
+            note["_display"] = source[:47] + "..." if len(source) > 50 else source
+            note["_display_src"] = source
+        return note["_display"]
+        
     def _populate_notes_list(self):
-        """Populate the notes list with loaded data"""
-        # Clear existing items
-        for widget in self.notes_list.winfo_children():
-            widget.destroy()
+        """Populate the notes list with loaded data matching the search text"""
+        self._shown_notes = self._filtered_notes()
+        self._render_notes()
+        
+    def _render_notes(self):
+        """Show the window of notes starting at the scroll offset"""
+        notes = self._shown_notes
+        self._notes_offset = max(0, min(self._notes_offset, len(notes) - self._visible_rows))
+        window = notes[self._notes_offset:self._notes_offset + self._visible_rows]
+        
+        # Existing rows are reconfigured rather than rebuilt, since creating
+        # widgets is the expensive part of a refresh
+        for i, note in enumerate(window):
+            content = self._display_text(note)
             
-        # Add notes to the list
-        for i, note in enumerate(self.notes_data):
-            note_frame = ctk.CTkFrame(self.notes_list)
+            if i < len(self._note_rows):
+                note_frame, note_btn = self._note_rows[i]
+                if self._row_texts[i] != content:
+                    note_btn.configure(text=content)
+                    self._row_texts[i] = content
+                note_btn.configure(command=partial(self._select_note, note))
+            else:
+                note_frame = ctk.CTkFrame(self.notes_list)
+                note_frame.grid_columnconfigure(0, weight=1)
+                
+                note_btn = ctk.CTkButton(
+                    note_frame,
+                    text=content,
+                    fg_color="transparent",
+                    text_color=("gray10", "gray90"),
+                    anchor="w",
+                    command=partial(self._select_note, note)
+                )
+                note_btn.grid(row=0, column=0, sticky="ew", padx=0, pady=0)
+                self._bind_notes_wheel(note_frame)
+                self._bind_notes_wheel(note_btn)
+                self._note_rows.append((note_frame, note_btn))
+                self._row_texts.append(content)
+                
+            # grid() restores a removed row with its previous options
             note_frame.grid(row=i, column=0, sticky="ew", padx=5, pady=5)
-            note_frame.grid_columnconfigure(0, weight=1)
             
-            # Truncate content for display
-            content = note.get("content", "")
-            if len(content) > 50:
-                content = content[:47] + "..."
-                
-            note_btn = ctk.CTkButton(
-                note_frame,
-                text=content,
-                fg_color="transparent",
-                text_color=("gray10", "gray90"),
-                anchor="w",
-                command=lambda n=note: self._select_note(n)
-            )
-            note_btn.grid(row=0, column=0, sticky="ew", padx=0, pady=0)
+        # Hide rows not needed for this window, keeping them for reuse
+        for note_frame, _ in self._note_rows[len(window):]:
+            note_frame.grid_remove()
+            
+        if notes:
+            self.notes_scrollbar.set(self._notes_offset / len(notes),
+                                     (self._notes_offset + len(window)) / len(notes))
+        else:
+            self.notes_scrollbar.set(0.0, 1.0)
+            
+    def _row_height(self) -> int:
+        """Height of one note row including its padding"""
+        if self._note_rows:
+            return self._note_rows[0][0].winfo_reqheight() + 10
+        return _DEFAULT_ROW_HEIGHT
+        
+    def _on_notes_list_resize(self, event):
+        """Fit the number of rows to the list height"""
+        visible_rows = max(1, event.height // self._row_height())
+        if visible_rows != self._visible_rows:
+            self._visible_rows = visible_rows
+            self._render_notes()
             
+    def _scroll_notes(self, rows: int):
+        """Move the window of shown notes by a number of rows"""
+        self._notes_offset += rows
+        self._render_notes()
+        
+    def _on_notes_scroll(self, action: str, *args):
+        """Handle scrollbar drags and clicks"""
+        if action == "moveto":
+            self._notes_offset = round(float(args[0]) * len(self._shown_notes))
+            self._render_notes()
+        elif action == "scroll":
+            step = self._visible_rows if args[1] == "pages" else 1
+            self._scroll_notes(int(args[0]) * step)
+            
+    def _on_notes_wheel(self, event):
+        """Scroll the notes list with the mouse wheel"""
+        # X11 reports wheel motion as buttons 4 and 5, other platforms as a delta
+        if event.num == 4 or event.delta > 0:
+            self._scroll_notes(-_WHEEL_ROWS)
+        elif event.num == 5 or event.delta < 0:
+            self._scroll_notes(_WHEEL_ROWS)
+            
+    def _bind_notes_wheel(self, widget):
+        """Route mouse wheel events over a widget to the notes list"""
+        widget.bind("<MouseWheel>", self._on_notes_wheel)
+        widget.bind("<Button-4>", self._on_notes_wheel)
+        widget.bind("<Button-5>", self._on_notes_wheel)
+        
     def _select_note(self, note: Dict[str, Any]):
         """Select a note to display in the editor"""
+        # List rows may be summaries without content; loading one as-is would
+        # autosave an empty editor over the stored note
+        if "content" in note:
+            self._selecting_id = None
+            self.note_editor.load_note(note)
+            return
+            
+        self._selecting_id = note["id"]
+        self.runtime.submit_ui(self.root, self.api_client.get_note(note["id"]),
+                               partial(self._on_note_fetched, note["id"]))
+        
+    def _on_note_fetched(self, note_id: str, future: Future):
+        """Load a fetched note into the editor, unless another note was selected since"""
+        if note_id != self._selecting_id:
+            return
+        self._selecting_id = None
+        
+        try:
+            note = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load note: {str(e)}")
+            return
+            
+        if "error" in note:
+            messagebox.showerror("Error", f"Failed to load note: {note['error']}")
+            return
+            
         self.note_editor.load_note(note)
         
     def _create_new_note(self):
         """Create a new empty note"""
+        self._selecting_id = None
         self.note_editor.clear()
         
     def _load_initial_data(self):
         """Load initial data when the application starts"""
-        # Use asyncio to run async methods in the main thread
-        async def async_load():
-            await self._load_notes()
-            
-        # Create an event loop that can run in the main thread
-        loop = asyncio.new_event_loop()
-        try:
-            loop.run_until_complete(async_load())
-        finally:
-            loop.close()
+        # The conversation is started alongside the notes request rather than
+        # after it, so it is usually ready before the Conversation tab is opened
+        self._load_notes()
+        self.runtime.submit(self.conversation_service.ensure_conversation())
             
     def on_closing(self):
         """Handle window closing"""
         # Clean up resources
-        self.conversation_view.on_close()
+        if self.conversation_view is not None:
+            self.conversation_view.on_close()
+        elif self.conversation_service.active_conversation_id:
+            # Started in the background but never opened
+            try:
+                self.runtime.submit(self.conversation_service.end_conversation()).result(timeout=5)
+            except (TimeoutError, ValueError):
+                pass
+        self.runtime.stop()
         
         # Exit the application
         self.root.destroy()
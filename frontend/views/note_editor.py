@@ -3,28 +3,63 @@ Note Editor
 
 This module provides the note editor UI component for the Noterer application.
 """
+import asyncio
 import customtkinter as ctk
 import tkinter as tk
-from tkinter import messagebox
-import asyncio
-from typing import Dict, List, Any, Optional, Callable
+from concurrent.futures import Future
+from functools import partial
+from typing import Dict, List, Any, Optional, Callable, Tuple
 
 from frontend.api_client import APIClient
+from frontend.services.async_runtime import AsyncRuntime
+
+# How long status messages stay up, in milliseconds
+_TOAST_MS = 2000
+_ERROR_TOAST_MS = 5000
+
+# Idle time after the last edit before the note is saved, in milliseconds
+_AUTOSAVE_DELAY_MS = 800
+
+# How long AI operations wait for others to share their request, in seconds
+_AI_BATCH_WINDOW = 0.02
 
 class NoteEditor(ctk.CTkFrame):
     """Note editor UI component"""
     
-    def __init__(self, parent, api_client: APIClient):
+    def __init__(self, parent, api_client: APIClient, runtime: Optional[AsyncRuntime] = None):
         """
         Initialize the note editor
         
         Args:
             parent: Parent widget
             api_client: API client for backend communication
+            runtime: Shared async runtime to do network I/O on (a private one is started if omitted)
         """
         super().__init__(parent)
         self.api_client = api_client
+        
+        # Requests run on the runtime's persistent background loop; results
+        # come back to the Tk thread, which stays responsive meanwhile
+        self._owns_runtime = runtime is None
+        self.runtime = runtime or AsyncRuntime(api_client.http_session)
+        # AI operations waiting to be sent together; only touched on the loop thread
+        self._pending_ops: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
         self.current_note = None
+        # Hash of the content as last loaded or saved, to skip no-op saves
+        self._saved_hash: Optional[int] = None
+        # Pending autosave timer, whether a save is waiting on the backend, and
+        # the saves held back until it returns
+        self._autosave_job: Optional[str] = None
+        self._saving = False
+        self._queued_saves: List[Tuple[str, int, Optional[Dict[str, Any]], int, bool]] = []
+        # Bumped whenever another note is loaded, so late saves can be told apart
+        self._generation = 0
+        # Stripped editor text, re-read from the widget only after an edit
+        self._content_cache = ""
+        self._content_dirty = True
+        # Timer that clears the status message
+        self._toast_job: Optional[str] = None
         
         # Configure grid
         self.grid_columnconfigure(0, weight=1)
@@ -56,6 +91,22 @@ class NoteEditor(ctk.CTkFrame):
         )
         self.process_btn.pack(side=tk.LEFT, padx=5, pady=5)
         
+        # Status messages, shown in place of modal dialogs
+        self.status_label = ctk.CTkLabel(self.toolbar, text="")
+        self.status_label.pack(side=tk.LEFT, padx=5, pady=5)
+        
+    def _toast(self, text: str, color: str, duration_ms: int = _TOAST_MS):
+        """Show a status message that clears itself, without blocking the UI"""
+        if self._toast_job is not None:
+            self.after_cancel(self._toast_job)
+        self.status_label.configure(text=text, text_color=color)
+        self._toast_job = self.after(duration_ms, self._clear_toast)
+        
+    def _clear_toast(self):
+        """Clear the status message"""
+        self._toast_job = None
+        self.status_label.configure(text="")
+        
     def _create_editor(self):
         """Create the text editor"""
         self.editor_frame = ctk.CTkFrame(self)
@@ -69,6 +120,7 @@ class NoteEditor(ctk.CTkFrame):
             font=("TkDefaultFont", 12)
         )
         self.text_editor.grid(row=0, column=0, sticky="nsew", padx=0, pady=0)
+        self.text_editor.bind("<<Modified>>", self._on_modified)
         
     def _create_ai_interaction(self):
         """Create the AI interaction area"""
@@ -92,7 +144,14 @@ class NoteEditor(ctk.CTkFrame):
         )
         self.ai_btn.grid(row=0, column=1, sticky="e", padx=5, pady=5)
         
-        # AI response area
+        # The response area is built by _ensure_ai_response on first use
+        self.ai_response = None
+        
+    def _ensure_ai_response(self):
+        """Create the AI response area, if not done yet"""
+        if self.ai_response is not None:
+            return
+            
         self.ai_response_frame = ctk.CTkFrame(self)
         self.ai_response_frame.grid(row=3, column=0, sticky="ew", padx=5, pady=5)
         self.ai_response_frame.grid_columnconfigure(0, weight=1)
@@ -114,140 +173,274 @@ class NoteEditor(ctk.CTkFrame):
         Args:
             note: Note data dictionary
         """
+        # Edits to the outgoing note are saved before it is replaced
+        self._flush_autosave()
+        self._generation += 1
+        self._content_dirty = True
         self.current_note = note
+        self._saved_hash = hash(note.get("content", "").strip())
         
         # Clear and update the editor
         self.text_editor.delete("0.0", "end")
         self.text_editor.insert("0.0", note.get("content", ""))
         
         # Clear AI response
-        self.ai_response.configure(state="normal")
-        self.ai_response.delete("0.0", "end")
-        self.ai_response.configure(state="disabled")
+        self._set_ai_response("")
         
     def clear(self):
         """Clear the editor for a new note"""
+        self._flush_autosave()
+        self._generation += 1
+        self._content_dirty = True
         self.current_note = None
+        self._saved_hash = None
         self.text_editor.delete("0.0", "end")
         
         # Clear AI response
+        self._set_ai_response("")
+        
+    def _set_ai_response(self, text: str):
+        """Replace the AI response text; the box is unlocked only for the write"""
+        if self.ai_response is None:
+            if not text:
+                # Nothing to clear until a response has been shown
+                return
+            self._ensure_ai_response()
+            
         self.ai_response.configure(state="normal")
         self.ai_response.delete("0.0", "end")
+        if text:
+            self.ai_response.insert("0.0", text)
         self.ai_response.configure(state="disabled")
         
-    async def _save_note_async(self):
-        """Save the current note asynchronously"""
-        content = self.text_editor.get("0.0", "end").strip()
-        if not content:
-            messagebox.showwarning("Warning", "Cannot save empty note")
+    async def _save_note_async(self, content: str, note_id: Optional[str]) -> Dict[str, Any]:
+        """Save note content asynchronously, updating the note if it has an ID"""
+        if note_id:
+            return await self.api_client.update_note(note_id, content)
+        return await self.api_client.create_note(content)
+        
+    def _content(self) -> str:
+        """Get the stripped editor text, copying it out of Tk only if it changed"""
+        if self._content_dirty:
+            self._content_cache = self.text_editor.get("0.0", "end-1c").strip()
+            self._content_dirty = False
+        return self._content_cache
+        
+    def _on_modified(self, event=None):
+        """Restart the autosave timer on every edit"""
+        # Clearing the flag below raises <<Modified>> once more; ignore that one
+        if not self.text_editor.edit_modified():
             return
             
-        if self.current_note:
-            # Update existing note
-            note_id = self.current_note.get("id")
-            try:
-                updated_note = await self.api_client.update_note(note_id, content)
-                self.current_note = updated_note
-                messagebox.showinfo("Success", "Note updated successfully")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to update note: {str(e)}")
-        else:
-            # Create new note
-            try:
-                new_note = await self.api_client.create_note(content)
-                self.current_note = new_note
-                messagebox.showinfo("Success", "Note created successfully")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to create note: {str(e)}")
-                
-    def _save_note(self):
-        """Save the current note (UI callback)"""
-        # Use asyncio to run async methods in the main thread
-        async def async_save():
-            await self._save_note_async()
-            
-        # Create an event loop that can run in the main thread
-        loop = asyncio.new_event_loop()
-        try:
-            loop.run_until_complete(async_save())
-        finally:
-            loop.close()
+        self._content_dirty = True
+        if self._autosave_job is not None:
+            self.after_cancel(self._autosave_job)
+        self._autosave_job = self.after(_AUTOSAVE_DELAY_MS, self._autosave)
+        # Re-arm the flag so the next edit raises <<Modified>> again
+        self.text_editor.edit_modified(False)
+        
+    def _autosave(self):
+        """Save quietly once editing pauses"""
+        self._autosave_job = None
+        self._save_note(notify=False)
+        
+    def _flush_autosave(self):
+        """Run a pending autosave now"""
+        if self._autosave_job is not None:
+            self.after_cancel(self._autosave_job)
+            self._autosave_job = None
+            self._save_note(notify=False)
             
-    async def _process_with_ai_async(self):
-        """Process the current note with AI asynchronously"""
-        content = self.text_editor.get("0.0", "end").strip()
+    def _save_note(self, notify: bool = True):
+        """
+        Save the current note (UI callback)
+        
+        Args:
+            notify: Whether to report success and warnings in the status bar (off for autosaves)
+        """
+        content = self._content()
         if not content:
-            messagebox.showwarning("Warning", "Cannot process empty note")
+            if notify:
+                self._toast("Cannot save empty note", color="orange")
             return
             
-        try:
-            result = await self.api_client.process_note(content)
-            
-            # Display extracted concepts and categories
-            self.ai_response.configure(state="normal")
-            self.ai_response.delete("0.0", "end")
-            
-            # Format the response
-            response_text = "AI Analysis:\n\n"
+        # Nothing changed since the note was loaded or last saved
+        content_hash = hash(content)
+        if self.current_note and content_hash == self._saved_hash:
+            return
             
-            if "extracted_concepts" in result:
-                response_text += "Concepts: " + ", ".join(result["extracted_concepts"]) + "\n\n"
-                
-            if "categories" in result:
-                response_text += "Categories:\n"
-                for cat in result["categories"]:
-                    response_text += f"- {cat['name']} ({cat['confidence']:.2f})\n"
-                    
-            self.ai_response.insert("0.0", response_text)
-            self.ai_response.configure(state="disabled")
+        save = (content, content_hash, self.current_note, self._generation, notify)
+        if self._saving:
+            # One save at a time: a new note must exist before a later save
+            # can update it rather than create it again. A newer save of the
+            # same note replaces one already waiting
+            if self._queued_saves and self._queued_saves[-1][3] == self._generation:
+                notify = notify or self._queued_saves[-1][4]
+                self._queued_saves[-1] = save[:4] + (notify,)
+            else:
+                self._queued_saves.append(save)
+            return
             
+        self._start_save(*save)
+        
+    def _start_save(self, content: str, content_hash: int, note: Optional[Dict[str, Any]],
+                    generation: int, notify: bool):
+        """Send a save to the backend"""
+        note_id = note.get("id") if note else None
+        self._saving = True
+        self.runtime.submit_ui(self, self._save_note_async(content, note_id),
+                               partial(self._on_note_saved, note=note, generation=generation,
+                                       content_hash=content_hash, notify=notify))
+        
+    def _on_note_saved(self, future: Future, note: Optional[Dict[str, Any]], generation: int,
+                       content_hash: int, notify: bool):
+        """Report the outcome of a save, then send the next queued one"""
+        self._saving = False
+        saved_note = self._report_save(future, note, generation, content_hash, notify)
+        while self._queued_saves:
+            queued_content, queued_hash, queued_note, queued_generation, queued_notify = self._queued_saves.pop(0)
+            if queued_generation == generation and saved_note is not None:
+                if queued_hash == content_hash:
+                    # The save that just returned already wrote this content
+                    continue
+                # Queued against the note this save wrote, which may have only just been created
+                queued_note = saved_note
+            self._start_save(queued_content, queued_hash, queued_note, queued_generation, queued_notify)
+            return
+        
+    def _report_save(self, future: Future, note: Optional[Dict[str, Any]], generation: int,
+                     content_hash: int, notify: bool) -> Optional[Dict[str, Any]]:
+        """Record and report a finished save, returning the saved note (None on failure)"""
+        action = "update" if note else "create"
+        try:
+            saved_note = future.result()
+            # The client reports failures as an error result rather than raising
+            if "error" in saved_note:
+                raise RuntimeError(saved_note["error"])
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to process note with AI: {str(e)}")
+            # Shown for autosaves too, so a failing backend doesn't go unnoticed;
+            # the note and its hash are kept, so the next save retries the same note
+            self._toast(f"Failed to {action} note: {str(e)}", color="red", duration_ms=_ERROR_TOAST_MS)
+            return None
             
+        # The editor may have moved on to another note meanwhile
+        if generation == self._generation:
+            self.current_note = saved_note
+            self._saved_hash = content_hash
+        if notify:
+            self._toast(f"Note {action}d", color="green")
+        return saved_note
+        
+    async def _submit_ai_op(self, op: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue an AI operation and wait for its result
+        
+        Operations submitted within _AI_BATCH_WINDOW of each other are sent to
+        the backend as one batch request.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending_ops.append((op, future))
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(_AI_BATCH_WINDOW, self._flush_batch)
+        return await future
+        
+    def _flush_batch(self):
+        """Send the queued AI operations"""
+        self._flush_handle = None
+        ops, self._pending_ops = self._pending_ops, []
+        asyncio.ensure_future(self._run_batch(ops))
+        
+    async def _run_batch(self, ops: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        """Run queued AI operations, resolving each one's future with its result"""
+        if len(ops) > 1:
+            response = await self.api_client.batch([op for op, _ in ops])
+            results = response.get("results")
+            if results is not None and len(results) == len(ops):
+                for (_, future), result in zip(ops, results):
+                    if not future.done():
+                        future.set_result(result)
+                return
+                
+        # A lone operation, or a failed batch, goes to its own endpoint
+        results = await asyncio.gather(*(self._run_ai_op(op) for op, _ in ops), return_exceptions=True)
+        for (_, future), result in zip(ops, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+                
+    async def _run_ai_op(self, op: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a single AI operation on its own endpoint"""
+        if op["op"] == "process":
+            return await self.api_client.process_note(op["content"])
+        return await self.api_client.query_ai(op["prompt"], op.get("context_ids"))
+        
+    async def _process_with_ai_async(self, content: str) -> Dict[str, Any]:
+        """Process note content with AI asynchronously"""
+        return await self._submit_ai_op({"op": "process", "content": content})
+        
     def _process_with_ai(self):
         """Process the current note with AI (UI callback)"""
-        # Use asyncio to run async methods in the main thread
-        async def async_process():
-            await self._process_with_ai_async()
+        content = self._content()
+        if not content:
+            self._toast("Cannot process empty note", color="orange")
+            return
             
-        # Create an event loop that can run in the main thread
-        loop = asyncio.new_event_loop()
+        self.runtime.submit_ui(self, self._process_with_ai_async(content), self._on_note_processed)
+        
+    def _on_note_processed(self, future: Future):
+        """Display extracted concepts and categories"""
         try:
-            loop.run_until_complete(async_process())
-        finally:
-            loop.close()
+            result = future.result()
+        except Exception as e:
+            self._toast(f"Failed to process note with AI: {str(e)}", color="red", duration_ms=_ERROR_TOAST_MS)
+            return
+            
+        # Format the response
+        parts = ["AI Analysis:\n\n"]
+        
+        if "extracted_concepts" in result:
+            parts.append("Concepts: " + ", ".join(result["extracted_concepts"]) + "\n\n")
+            
+        if "categories" in result:
+            parts.append("Categories:\n")
+            parts.extend(f"- {cat['name']} ({cat['confidence']:.2f})\n" for cat in result["categories"])
             
-    async def _query_ai_async(self):
+        self._set_ai_response("".join(parts))
+        
+    async def _query_ai_async(self, query: str, context_ids: List[str]) -> Dict[str, Any]:
         """Query the AI asynchronously"""
+        return await self._submit_ai_op({"op": "query", "prompt": query, "context_ids": context_ids})
+        
+    def _query_ai(self):
+        """Query the AI (UI callback)"""
         query = self.ai_entry.get().strip()
         if not query:
-            messagebox.showwarning("Warning", "Please enter a query")
+            self._toast("Please enter a query", color="orange")
             return
             
-        content = self.text_editor.get("0.0", "end").strip()
         context_ids = [self.current_note["id"]] if self.current_note else []
+        self.runtime.submit_ui(self, self._query_ai_async(query, context_ids), self._on_ai_answered)
         
+    def _on_ai_answered(self, future: Future):
+        """Display the AI response to a query"""
         try:
-            result = await self.api_client.query_ai(query, context_ids)
-            
-            # Display AI response
-            self.ai_response.configure(state="normal")
-            self.ai_response.delete("0.0", "end")
-            self.ai_response.insert("0.0", result.get("response", "No response from AI"))
-            self.ai_response.configure(state="disabled")
-            
+            result = future.result()
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to query AI: {str(e)}")
-            
-    def _query_ai(self):
-        """Query the AI (UI callback)"""
-        # Use asyncio to run async methods in the main thread
-        async def async_query():
-            await self._query_ai_async()
+            self._toast(f"Failed to query AI: {str(e)}", color="red", duration_ms=_ERROR_TOAST_MS)
+            return
             
-        # Create an event loop that can run in the main thread
-        loop = asyncio.new_event_loop()
-        try:
-            loop.run_until_complete(async_query())
-        finally:
-            loop.close()
+        self._set_ai_response(result.get("response", "No response from AI"))
+        
+    def destroy(self):
+        """Cancel pending timers and stop a privately started runtime"""
+        if self._autosave_job is not None:
+            self.after_cancel(self._autosave_job)
+        if self._toast_job is not None:
+            self.after_cancel(self._toast_job)
+        if self._owns_runtime:
+            self.runtime.stop()
+        super().destroy()
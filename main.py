@@ -4,9 +4,9 @@ Main application entry point
 
 This script launches both the backend API server and frontend application.
 """
+import subprocess
 import sys
 import uvicorn
-import multiprocessing
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -15,7 +15,10 @@ load_dotenv()
 def start_backend():
     """Start the FastAPI backend server"""
     from backend.api.app import app
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    # The default "auto" loop and http settings pick uvloop and httptools
+    # (from uvicorn[standard]) when installed; per-request access logging is
+    # a synchronous stdout write, so it is off
+    uvicorn.run(app, host="127.0.0.1", port=8000, access_log=False)
 
 def start_frontend():
     """Start the desktop UI application"""
@@ -27,18 +30,26 @@ if __name__ == "__main__":
     # Determine if we should start only the backend, only the frontend, or both
     start_mode = sys.argv[1] if len(sys.argv) > 1 else "all"
     
-    if start_mode == "backend" or start_mode == "all":
-        # Start backend in a separate process
-        backend_process = multiprocessing.Process(target=start_backend)
-        backend_process.start()
-        print("Backend API server started at http://127.0.0.1:8000")
-    
-    if start_mode == "frontend" or start_mode == "all":
+    if start_mode == "backend":
+        # Serve in the foreground
+        start_backend()
+        
+    elif start_mode == "frontend" or start_mode == "all":
+        if start_mode == "all":
+            # Start backend as a fresh interpreter running "main.py backend",
+            # so it starts without inheriting or re-importing the GUI stack
+            backend_process = subprocess.Popen([sys.executable, __file__, "backend"])
+            print("Backend API server started at http://127.0.0.1:8000")
+            
         # Start frontend (in main process)
         print("Starting Noterer frontend application...")
-        start_frontend()
-        
-        # If we started the backend, clean up when frontend exits
-        if start_mode == "all" and 'backend_process' in locals():
-            backend_process.terminate()
-            backend_process.join()
+        try:
+            start_frontend()
+        finally:
+            # If we started the backend, clean up when frontend exits
+            if start_mode == "all":
+                backend_process.terminate()
+                try:
+                    backend_process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    backend_process.kill()
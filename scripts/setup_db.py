@@ -4,15 +4,20 @@ Neo4j Database Setup Script
 This script initializes the Neo4j database with the required schema for Noterer,
 creating constraints and indexes for optimal performance.
 """
+import hashlib
 import os
 import sys
 import time
+from pathlib import Path
 from dotenv import load_dotenv
-from neo4j import GraphDatabase, exceptions
+from neo4j import WRITE_ACCESS, GraphDatabase, exceptions
 
 # Add project root to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# The schema is defined once, alongside the queries that rely on it
+from backend.db.graph_manager import Q_SCHEMA as SCHEMA_STMTS
+
 # Load environment variables
 load_dotenv()
 
@@ -20,112 +25,106 @@ load_dotenv()
 URI = os.getenv("NEO4J_URI", "neo4j://localhost:7687")
 USERNAME = os.getenv("NEO4J_USERNAME", "neo4j")
 PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
+DATABASE = os.getenv("NEO4J_DATABASE", "neo4j")
+
+# Written after a successful setup so later runs can skip it. It holds a hash
+# of the target and the schema, so pointing at another database or changing
+# SCHEMA_STMTS sets up again
+SCHEMA_SENTINEL = Path(__file__).resolve().parent.parent / ".noterer_schema"
+SCHEMA_FINGERPRINT = hashlib.sha256("\x1f".join((URI, DATABASE) + SCHEMA_STMTS).encode()).hexdigest()
+
+# Philosophical categories every database starts with
+CATEGORIES = (
+    "Teleology",
+    "Causality",
+    "Epistemology",
+    "Ontology",
+    "Axiology",
+    "Phenomenology",
+    "Temporality",
+)
+
+MERGE_CATEGORIES = "UNWIND $names AS name MERGE (c:Category {name: name})"
+
+# Sample data, created with --with-samples. The queries take it as
+# parameters, so Neo4j plans each of them once
+SAMPLE_NOTE = "Philosophy is the study of fundamental questions about existence, knowledge, values, reason, mind, and language."
+SAMPLE_CONCEPTS = ("Philosophy", "Knowledge", "Existence")
+SAMPLE_CATEGORY_LINKS = [
+    {"concept": "Knowledge", "category": "Epistemology", "weight": 0.9},
+    {"concept": "Existence", "category": "Ontology", "weight": 0.8},
+]
+
+CREATE_SAMPLE_NOTE = """
+CREATE (n:Note {id: randomUUID(), content: $content, created_at: datetime(), updated_at: datetime()})
+WITH n
+UNWIND $concepts AS name
+MERGE (c:Concept {name: name})
+MERGE (n)-[:ABOUT]->(c)
+"""
+
+LINK_SAMPLE_CATEGORIES = """
+UNWIND $links AS l
+MATCH (c:Concept {name: l.concept}), (cat:Category {name: l.category})
+MERGE (c)-[r:BELONGS_TO]->(cat)
+SET r.weight = l.weight
+"""
+
+def _already_set_up() -> bool:
+    """Whether this schema was already set up on this database"""
+    try:
+        return SCHEMA_SENTINEL.read_text().strip() == SCHEMA_FINGERPRINT
+    except OSError:
+        return False
 
 def setup_database():
     """Set up the Neo4j database with schema, constraints, and indexes"""
+    # Pass --force to set up again, e.g. after the database was wiped
+    if _already_set_up() and "--force" not in sys.argv and "--with-samples" not in sys.argv:
+        print("Database already set up; skipping (use --force to run again).")
+        return True
+        
     print(f"Connecting to Neo4j database at {URI}...")
     
     try:
         # Create driver
         driver = GraphDatabase.driver(URI, auth=(USERNAME, PASSWORD))
         
-        # Test connection
-        with driver.session() as session:
-            result = session.run("RETURN 1 AS num")
-            assert result.single()["num"] == 1
-            print("Connection successful!")
-            
-        # Create schema constraints and indexes
-        with driver.session() as session:
-            # Create constraints
-            print("Creating constraints...")
-            
-            # Ensure uniqueness for Note IDs
-            session.run("""
-            CREATE CONSTRAINT note_id_unique IF NOT EXISTS
-            FOR (n:Note) REQUIRE n.id IS UNIQUE
-            """)
-            
-            # Ensure uniqueness for Concept names
-            session.run("""
-            CREATE CONSTRAINT concept_name_unique IF NOT EXISTS
-            FOR (c:Concept) REQUIRE c.name IS UNIQUE
-            """)
-            
-            # Ensure uniqueness for Category names
-            session.run("""
-            CREATE CONSTRAINT category_name_unique IF NOT EXISTS
-            FOR (cat:Category) REQUIRE cat.name IS UNIQUE
-            """)
-            
-            # Create indexes
-            print("Creating indexes...")
-            
-            # Index for Note content search
-            session.run("""
-            CREATE TEXT INDEX note_content_index IF NOT EXISTS
-            FOR (n:Note) ON (n.content)
-            """)
-            
-            # Index for Note created_at timestamp
-            session.run("""
-            CREATE INDEX note_timestamp_index IF NOT EXISTS
-            FOR (n:Note) ON (n.created_at)
-            """)
+        # Test connection; a handshake only, no query to plan
+        driver.verify_connectivity()
+        print("Connection successful!")
+        
+        # One session, and so one pooled connection, serves every step. Naming
+        # the database skips home database resolution, and every step writes
+        with driver.session(database=DATABASE, default_access_mode=WRITE_ACCESS) as session:
+            # Create constraints and indexes
+            print("Creating constraints and indexes...")
+            # Each statement runs as its own auto-commit transaction, the same
+            # way GraphManager.ensure_schema applies them
+            for stmt in SCHEMA_STMTS:
+                session.run(stmt).consume()
+                
+            # New indexes populate in the background; wait for them so setup
+            # doesn't report success before the schema is online
+            session.run("CALL db.awaitIndexes(30)").consume()
             
             # Create philosophical categories
             print("Creating philosophical categories...")
-            categories = [
-                "Teleology",
-                "Causality", 
-                "Epistemology", 
-                "Ontology", 
-                "Axiology", 
-                "Phenomenology", 
-                "Temporality"
-            ]
+            # One round-trip for all categories
+            session.run(MERGE_CATEGORIES, names=list(CATEGORIES))
             
-            for category in categories:
-                session.run("""
-                MERGE (c:Category {name: $name})
-                RETURN c
-                """, name=category)
-                
             # Create sample data if running in test mode
             if "--with-samples" in sys.argv:
                 print("Creating sample data...")
                 
-                # Sample note
-                session.run("""
-                CREATE (n:Note {
-                    id: randomUUID(),
-                    content: "Philosophy is the study of fundamental questions about existence, knowledge, values, reason, mind, and language.",
-                    created_at: datetime(),
-                    updated_at: datetime()
-                })
-                RETURN n
-                """)
-                
-                # Sample concepts
-                session.run("""
-                MERGE (c1:Concept {name: "Philosophy"})
-                MERGE (c2:Concept {name: "Knowledge"})
-                MERGE (c3:Concept {name: "Existence"})
-                
-                WITH c1, c2, c3
-                
-                MATCH (n:Note) WHERE n.content CONTAINS "Philosophy"
-                MATCH (e:Category {name: "Epistemology"})
-                MATCH (o:Category {name: "Ontology"})
+                # Sample note, linked to its concepts
+                session.run(CREATE_SAMPLE_NOTE, content=SAMPLE_NOTE, concepts=list(SAMPLE_CONCEPTS))
                 
-                MERGE (n)-[:ABOUT]->(c1)
-                MERGE (n)-[:ABOUT]->(c2)
-                MERGE (n)-[:ABOUT]->(c3)
-                MERGE (c2)-[:BELONGS_TO {weight: 0.9}]->(e)
-                MERGE (c3)-[:BELONGS_TO {weight: 0.8}]->(o)
-                """)
+                # Sample concept categories
+                session.run(LINK_SAMPLE_CATEGORIES, links=SAMPLE_CATEGORY_LINKS)
                 
             print("Database setup complete!")
+            SCHEMA_SENTINEL.write_text(SCHEMA_FINGERPRINT)
             
     except exceptions.AuthError:
         print("Authentication error. Please check your Neo4j username and password.")
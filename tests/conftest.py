@@ -0,0 +1,99 @@
+"""
+Shared test fixtures
+"""
+import pytest
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis.asyncio the backend uses"""
+    
+    def __init__(self):
+        self.values = {}
+        self.expiry = {}
+        self.zsets = {}
+        # Number of round-trips made: one per command or pipeline execute
+        self.round_trips = 0
+        
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+        
+    async def get(self, key):
+        self.round_trips += 1
+        return self._get(key)
+        
+    async def set(self, key, value, ex=None):
+        self.round_trips += 1
+        return self._set(key, value, ex)
+        
+    async def zrangebyscore(self, key, min, max, start=None, num=None):
+        self.round_trips += 1
+        low = float(min)
+        high = float(max)
+        members = sorted(
+            (score, member) for member, score in self.zsets.get(key, {}).items() if low <= score <= high
+        )
+        members = [member for _, member in members]
+        if start is not None:
+            members = members[start:start + num]
+        return [member.encode() for member in members]
+        
+    def _get(self, key):
+        return self.values.get(key)
+        
+    def _set(self, key, value, ex=None):
+        self.values[key] = value if isinstance(value, bytes) else str(value).encode()
+        if ex is not None:
+            self.expiry[key] = ex
+        return True
+        
+    def _zadd(self, key, mapping, xx=False):
+        zset = self.zsets.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            if xx and member not in zset:
+                continue
+            added += member not in zset
+            zset[member] = score
+        return added
+        
+    def _delete(self, *keys):
+        return sum(self.values.pop(key, None) is not None for key in keys)
+        
+    def _zrem(self, key, *members):
+        zset = self.zsets.get(key, {})
+        members = [m.decode() if isinstance(m, bytes) else m for m in members]
+        return sum(zset.pop(member, None) is not None for member in members)
+
+class FakePipeline:
+    """Queues commands and runs them in one round-trip on execute"""
+    
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.commands = []
+        
+    def get(self, key):
+        self.commands.append((self.redis._get, (key,), {}))
+        
+    def set(self, key, value, ex=None):
+        self.commands.append((self.redis._set, (key, value, ex), {}))
+        
+    def zadd(self, key, mapping, xx=False):
+        self.commands.append((self.redis._zadd, (key, mapping), {"xx": xx}))
+        
+    def delete(self, *keys):
+        self.commands.append((self.redis._delete, keys, {}))
+        
+    def zrem(self, key, *members):
+        self.commands.append((self.redis._zrem, (key,) + members, {}))
+        
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [command(*args, **kwargs) for command, args, kwargs in self.commands]
+
+@pytest.fixture(autouse=True)
+def no_shared_redis(monkeypatch):
+    """Keep tests off any Redis configured in the environment"""
+    monkeypatch.delenv("REDIS_URL", raising=False)
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis()
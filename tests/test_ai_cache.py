@@ -0,0 +1,153 @@
+"""
+Tests for the AI response cache
+"""
+import pytest
+
+from backend.ai import cache as cache_module
+from backend.ai.cache import AIResponseCache, content_cached
+from backend.core import serialization
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for the cache's time.monotonic"""
+    class Clock:
+        now = 1000.0
+        
+        def monotonic(self):
+            return self.now
+            
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock.monotonic)
+    return clock
+
+class FailingRedis:
+    """Redis client whose every command fails"""
+    
+    def pipeline(self, transaction: bool = True):
+        return self
+        
+    def get(self, key):
+        pass
+        
+    async def execute(self):
+        raise ConnectionError("redis down")
+        
+    async def set(self, key, value, ex=None):
+        raise ConnectionError("redis down")
+
+# Exact tier
+
+def test_make_key_is_stable_and_separates_parts():
+    assert AIResponseCache.make_key("a", "b") == AIResponseCache.make_key("a", "b")
+    assert AIResponseCache.make_key("a", "b") != AIResponseCache.make_key("ab")
+    assert len(AIResponseCache.make_key("a")) == 32
+
+def test_exact_entries_expire_after_ttl(clock):
+    cache = AIResponseCache(ttl=60)
+    cache.set_exact("k", {"response": "hi"})
+    clock.now += 59
+    assert cache.get_exact("k") == {"response": "hi"}
+    clock.now += 2
+    assert cache.get_exact("k") is None
+
+def test_exact_tier_evicts_least_recently_used():
+    cache = AIResponseCache(max_entries=2)
+    cache.set_exact("a", {"response": "a"})
+    cache.set_exact("b", {"response": "b"})
+    # Reading "a" makes "b" the least recently used
+    cache.get_exact("a")
+    cache.set_exact("c", {"response": "c"})
+    assert cache.get_exact("b") is None
+    assert cache.get_exact("a") is not None
+    assert cache.get_exact("c") is not None
+
+async def test_get_many_without_redis_uses_memory_only():
+    cache = AIResponseCache()
+    assert cache.redis is None
+    cache.set_exact("a", {"response": "a"})
+    assert await cache.get_many(["a", "b"]) == [{"response": "a"}, None]
+
+async def test_get_many_fetches_misses_in_one_round_trip(fake_redis):
+    cache = AIResponseCache(redis=fake_redis)
+    cache.set_exact("a", {"response": "a"})
+    fake_redis.values[cache.key_prefix + "b"] = serialization.dumpb({"response": "b"})
+    fake_redis.values[cache.key_prefix + "c"] = b"not json"
+    
+    results = await cache.get_many(["a", "b", "c", "d"])
+    assert results == [{"response": "a"}, {"response": "b"}, None, None]
+    assert fake_redis.round_trips == 1
+    
+    # The Redis hit is backfilled into memory
+    assert cache.get_exact("b") == {"response": "b"}
+
+async def test_get_many_treats_redis_errors_as_misses():
+    cache = AIResponseCache(redis=FailingRedis())
+    cache.set_exact("a", {"response": "a"})
+    assert await cache.get_many(["a", "b"]) == [{"response": "a"}, None]
+
+async def test_put_writes_memory_and_redis_with_ttl(fake_redis):
+    cache = AIResponseCache(redis=fake_redis, ttl=90.5)
+    await cache.put("k", {"response": "hi"})
+    assert cache.get_exact("k") == {"response": "hi"}
+    assert serialization.loads(fake_redis.values[cache.key_prefix + "k"]) == {"response": "hi"}
+    assert fake_redis.expiry[cache.key_prefix + "k"] == 90
+
+async def test_put_keeps_memory_entry_when_redis_fails():
+    cache = AIResponseCache(redis=FailingRedis())
+    await cache.put("k", {"response": "hi"})
+    assert cache.get_exact("k") == {"response": "hi"}
+
+# Semantic tier
+
+def test_semantic_tier_disabled_by_default():
+    cache = AIResponseCache()
+    assert not cache.semantic_enabled
+    cache.set_semantic("ns", [1.0, 0.0], {"response": "hi"})
+    assert cache.get_semantic("ns", [1.0, 0.0]) is None
+
+def test_semantic_hit_requires_threshold():
+    cache = AIResponseCache(semantic_threshold=0.95)
+    cache.set_semantic("ns", [1.0, 0.0], {"response": "x"})
+    cache.set_semantic("ns", [0.0, 1.0], {"response": "y"})
+    # Scale does not matter, only direction
+    assert cache.get_semantic("ns", [2.0, 0.1]) == {"response": "x"}
+    assert cache.get_semantic("ns", [1.0, 1.0]) is None
+
+def test_semantic_namespaces_are_isolated():
+    cache = AIResponseCache(semantic_threshold=0.9)
+    cache.set_semantic("analysis", [1.0, 0.0], {"response": "x"})
+    assert cache.get_semantic("general", [1.0, 0.0]) is None
+
+def test_semantic_entries_expire_after_ttl(clock):
+    cache = AIResponseCache(ttl=60, semantic_threshold=0.9)
+    cache.set_semantic("ns", [1.0, 0.0], {"response": "x"})
+    clock.now += 61
+    assert cache.get_semantic("ns", [1.0, 0.0]) is None
+
+def test_semantic_tier_keeps_newest_entries():
+    cache = AIResponseCache(semantic_threshold=0.99, max_semantic_entries=1)
+    cache.set_semantic("ns", [1.0, 0.0], {"response": "x"})
+    cache.set_semantic("ns", [0.0, 1.0], {"response": "y"})
+    assert cache.get_semantic("ns", [1.0, 0.0]) is None
+    assert cache.get_semantic("ns", [0.0, 1.0]) == {"response": "y"}
+
+# Content memoization
+
+async def test_content_cached_memoizes_by_content():
+    calls = []
+    
+    class Processor:
+        @content_cached("test")
+        async def analyze(self, content):
+            calls.append(content)
+            return {"length": len(content)}
+            
+    processor = Processor()
+    assert await processor.analyze("abc") == {"length": 3}
+    assert await processor.analyze("abc") == {"length": 3}
+    assert await processor.analyze("abcd") == {"length": 4}
+    assert calls == ["abc", "abcd"]
+    
+    Processor.analyze.cache_clear()
+    await processor.analyze("abc")
+    assert calls == ["abc", "abcd", "abc"]
@@ -0,0 +1,87 @@
+"""
+Tests for micro-batching concurrent AI queries
+"""
+import asyncio
+
+import pytest
+
+from backend.ai.batching import BatchingAIManager
+
+class RecordingAIManager:
+    """Answers each prompt with itself and records the batches it was sent"""
+    
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+        
+    async def query(self, prompt, context=None, prompt_type="general", structured_output=False,
+                    semantic=True, cache_text=None):
+        self.batches.append(("direct", [prompt]))
+        return {"response": prompt}
+        
+    async def query_batch(self, prompts, context=None, prompt_type="general", structured_output=False,
+                          semantic=True, cache_texts=None):
+        self.batches.append(((prompt_type, structured_output, semantic, context), list(prompts), list(cache_texts)))
+        if self.fail:
+            raise RuntimeError("provider down")
+        return [{"response": prompt} for prompt in prompts]
+        
+    def analyze_note(self, content):
+        return f"analyzed {content}"
+
+@pytest.fixture
+async def batching():
+    ai_manager = RecordingAIManager()
+    batching = BatchingAIManager(ai_manager, max_batch=4, max_wait_ms=20)
+    batching.start()
+    yield batching
+    await batching.stop()
+
+async def test_concurrent_queries_share_one_batch(batching):
+    results = await asyncio.gather(*(batching.query(f"p{i}") for i in range(3)))
+    assert [result["response"] for result in results] == ["p0", "p1", "p2"]
+    assert batching.ai_manager.batches == [(("general", False, True, None), ["p0", "p1", "p2"], ["p0", "p1", "p2"])]
+
+async def test_batches_are_split_at_max_batch(batching):
+    results = await asyncio.gather(*(batching.query(f"p{i}") for i in range(6)))
+    assert [result["response"] for result in results] == [f"p{i}" for i in range(6)]
+    assert [len(batch[1]) for batch in batching.ai_manager.batches] == [4, 2]
+
+async def test_queries_are_grouped_by_options_and_context(batching):
+    await asyncio.gather(
+        batching.query("a"),
+        batching.query("b", structured_output=True),
+        batching.query("c", context=[{"id": "n1"}]),
+        batching.query("d"),
+        batching.query("e", semantic=False),
+    )
+    # Keyed by the first prompt of each group: (options, prompts)
+    groups = {prompts[0]: (options, prompts) for options, prompts, _ in batching.ai_manager.batches}
+    assert groups == {
+        "a": (("general", False, True, None), ["a", "d"]),
+        "b": (("general", True, True, None), ["b"]),
+        "c": (("general", False, True, [{"id": "n1"}]), ["c"]),
+        "e": (("general", False, False, None), ["e"]),
+    }
+
+async def test_cache_text_defaults_to_prompt(batching):
+    await asyncio.gather(batching.query("template: x", cache_text="x"), batching.query("y"))
+    assert batching.ai_manager.batches[0][2] == ["x", "y"]
+
+async def test_batch_failure_fails_every_query_in_it():
+    batching = BatchingAIManager(RecordingAIManager(fail=True), max_wait_ms=20)
+    batching.start()
+    try:
+        results = await asyncio.gather(batching.query("a"), batching.query("b"), return_exceptions=True)
+    finally:
+        await batching.stop()
+    assert [str(result) for result in results] == ["provider down", "provider down"]
+
+async def test_falls_back_to_direct_query_when_not_running():
+    batching = BatchingAIManager(RecordingAIManager())
+    assert await batching.query("a") == {"response": "a"}
+    assert batching.ai_manager.batches == [("direct", ["a"])]
+
+def test_unbatched_methods_pass_through():
+    batching = BatchingAIManager(RecordingAIManager())
+    assert batching.analyze_note("x") == "analyzed x"
@@ -0,0 +1,41 @@
+"""
+Tests for extracting proposed actions from AI responses
+"""
+import pytest
+
+from backend.ai.conversation_controller import ConversationalFlowController
+
+@pytest.fixture
+def controller() -> ConversationalFlowController:
+    # Extraction never touches the AI manager
+    return ConversationalFlowController(ai_manager=None)
+
+def test_extracts_actions_and_strips_block(controller):
+    response = (
+        "I can link these notes.\n"
+        '```json\n{"proposed_actions": [{"type": "link", "source": "a", "target": "b"}]}\n```\n'
+        "Shall I go ahead?"
+    )
+    text, actions = controller._extract_actions_from_response(response)
+    assert text == "I can link these notes.\n\nShall I go ahead?"
+    assert actions == [{"type": "link", "source": "a", "target": "b"}]
+
+def test_response_without_block_is_returned_unchanged(controller):
+    response = "  Nothing to do here.  "
+    assert controller._extract_actions_from_response(response) == (response, [])
+
+def test_unclosed_block_is_returned_unchanged(controller):
+    response = 'Here you go\n```json\n{"proposed_actions": []}'
+    assert controller._extract_actions_from_response(response) == (response, [])
+
+def test_malformed_json_is_returned_unchanged(controller):
+    response = "Here you go\n```json\n{not json}\n```"
+    assert controller._extract_actions_from_response(response) == (response, [])
+
+def test_non_object_json_yields_no_actions(controller):
+    response = 'Here you go\n```json\n[{"type": "link"}]\n```'
+    assert controller._extract_actions_from_response(response) == ("Here you go", [])
+
+def test_object_without_actions_yields_no_actions(controller):
+    response = '```json\n{"summary": "none"}\n```Done.'
+    assert controller._extract_actions_from_response(response) == ("Done.", [])
@@ -0,0 +1,120 @@
+"""
+Tests for the conversation store, in process and through Redis
+"""
+import pytest
+
+from backend.ai import conversation_store
+from backend.ai.conversation_controller import Conversation
+from backend.ai.conversation_store import ConversationStore
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for the store's time.time"""
+    class Clock:
+        now = 1_000_000.0
+        
+        def time(self):
+            return self.now
+            
+    clock = Clock()
+    monkeypatch.setattr(conversation_store.time, "time", clock.time)
+    return clock
+
+def _conversation(conversation_id: str) -> Conversation:
+    conversation = Conversation(conversation_id)
+    conversation.start_new_turn(f"hello from {conversation_id}")
+    return conversation
+
+# In-process store
+
+async def test_local_get_returns_stored_conversation():
+    store = ConversationStore()
+    conversation = _conversation("a")
+    await store.set(conversation)
+    assert await store.get("a") is conversation
+    assert await store.get("missing") is None
+
+async def test_local_evicts_least_recently_used():
+    store = ConversationStore(max_local=2)
+    for conversation_id in ("a", "b"):
+        await store.set(_conversation(conversation_id))
+    # Reading "a" makes "b" the least recently used
+    await store.get("a")
+    await store.set(_conversation("c"))
+    assert await store.get("b") is None
+    assert await store.get("a") is not None
+    assert await store.get("c") is not None
+
+async def test_local_get_expires_idle_conversation(clock):
+    store = ConversationStore(idle_ttl=60)
+    await store.set(_conversation("a"))
+    clock.now += 61
+    assert await store.get("a") is None
+    assert "a" not in store._local
+
+async def test_local_expire_idle_in_batches(clock):
+    store = ConversationStore(idle_ttl=60)
+    for conversation_id in ("a", "b", "c"):
+        await store.set(_conversation(conversation_id))
+    clock.now += 30
+    await store.set(_conversation("fresh"))
+    clock.now += 40
+    
+    assert await store.expire_idle(batch_size=2) == 2
+    assert await store.expire_idle(batch_size=2) == 1
+    assert await store.expire_idle(batch_size=2) == 0
+    assert list(store._local) == ["fresh"]
+
+async def test_local_delete():
+    store = ConversationStore()
+    await store.set(_conversation("a"))
+    assert await store.delete("a") is True
+    assert await store.delete("a") is False
+
+# Redis-backed store
+
+async def test_redis_round_trips_conversation(fake_redis):
+    store = ConversationStore(redis=fake_redis)
+    await store.set(_conversation("a"))
+    
+    loaded = await store.get("a")
+    assert loaded is not None
+    assert loaded.conversation_id == "a"
+    assert loaded.current_turn.user_input == "hello from a"
+    assert await store.get("missing") is None
+
+async def test_redis_get_and_touch_share_one_round_trip(fake_redis, clock):
+    store = ConversationStore(redis=fake_redis)
+    await store.set(_conversation("a"))
+    clock.now += 10
+    
+    before = fake_redis.round_trips
+    await store.get("a")
+    assert fake_redis.round_trips == before + 1
+    assert fake_redis.zsets[store.index_key]["a"] == clock.now
+
+async def test_redis_get_does_not_index_missing_conversation(fake_redis):
+    store = ConversationStore(redis=fake_redis)
+    await store.get("missing")
+    assert "missing" not in fake_redis.zsets.get(store.index_key, {})
+
+async def test_redis_delete(fake_redis):
+    store = ConversationStore(redis=fake_redis)
+    await store.set(_conversation("a"))
+    assert await store.delete("a") is True
+    assert await store.delete("a") is False
+    assert fake_redis.zsets[store.index_key] == {}
+
+async def test_redis_expire_idle_in_batches(fake_redis, clock):
+    store = ConversationStore(redis=fake_redis, idle_ttl=60)
+    for conversation_id in ("a", "b", "c"):
+        await store.set(_conversation(conversation_id))
+    clock.now += 30
+    await store.set(_conversation("fresh"))
+    clock.now += 40
+    
+    assert await store.expire_idle(batch_size=2) == 2
+    assert await store.expire_idle(batch_size=2) == 1
+    assert await store.expire_idle(batch_size=2) == 0
+    assert list(fake_redis.zsets[store.index_key]) == ["fresh"]
+    assert set(fake_redis.values) == {store._key("fresh")}
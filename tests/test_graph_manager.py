@@ -0,0 +1,116 @@
+"""
+Tests for GraphManager query building and batching, run against a recording transaction
+"""
+import pytest
+
+from backend.db import graph_manager as graph_manager_module
+from backend.db.graph_manager import GraphManager, Q_CREATE_RELATIONSHIP, Q_MERGE_CONCEPTS, _relationship_query
+
+class RecordingResult:
+    """Query result yielding canned records"""
+    
+    def __init__(self, records):
+        self.records = records
+        
+    def __aiter__(self):
+        return self._iterate()
+        
+    async def _iterate(self):
+        for record in self.records:
+            yield record
+            
+    async def single(self):
+        return self.records[0] if self.records else None
+        
+    async def consume(self):
+        pass
+
+class RecordingTransaction:
+    """Transaction that records each statement and answers concept merges"""
+    
+    def __init__(self):
+        self.runs = []
+        
+    async def run(self, query, **params):
+        self.runs.append((query, params))
+        if query == Q_MERGE_CONCEPTS:
+            return RecordingResult([{"name": row["name"], "id": f"id-{row['name']}"} for row in params["rows"]])
+        return RecordingResult([])
+
+@pytest.fixture
+def graph_manager():
+    # The driver connects lazily, so no database is needed until a session runs
+    return GraphManager(uri="neo4j://localhost:7687", warmup=False)
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    monkeypatch.setattr(graph_manager_module, "_UNWIND_BATCH_SIZE", 2)
+
+async def test_bulk_concepts_are_merged_in_unwind_batches(graph_manager, small_batches):
+    tx = RecordingTransaction()
+    rows = [{"name": name} for name in "abcde"]
+    concept_ids = await graph_manager._bulk_create_concepts_tx(tx, rows)
+    
+    assert [len(params["rows"]) for _, params in tx.runs] == [2, 2, 1]
+    assert concept_ids == {name: f"id-{name}" for name in "abcde"}
+
+async def test_bulk_relationships_are_created_in_unwind_batches(graph_manager, small_batches):
+    tx = RecordingTransaction()
+    rows = [{"source": "n1", "target": f"c{i}", "properties": {}} for i in range(3)]
+    await graph_manager._bulk_create_relationships_tx(tx, "ABOUT", rows)
+    
+    assert [params["rows"] for _, params in tx.runs] == [rows[:2], rows[2:]]
+    assert all("`ABOUT`" in query for query, _ in tx.runs)
+
+async def test_bulk_category_links_are_written_in_unwind_batches(graph_manager, small_batches):
+    tx = RecordingTransaction()
+    rows = [{"concept_id": "c1", "category": "Ontology", "weight": 0.5}] * 3
+    await graph_manager._bulk_assign_categories_tx(tx, rows)
+    assert [len(params["rows"]) for _, params in tx.runs] == [2, 1]
+
+async def test_bulk_writes_skip_the_database_when_empty(graph_manager, monkeypatch):
+    async def fail(*args):
+        raise AssertionError("no transaction expected")
+    monkeypatch.setattr(graph_manager, "_write", fail)
+    
+    assert await graph_manager.bulk_create_concepts([]) == {}
+    assert await graph_manager.bulk_assign_categories([]) is None
+    assert await graph_manager.bulk_create_relationships("ABOUT", []) is None
+    assert await graph_manager.create_notes_batch([]) == []
+
+async def test_bulk_concepts_deduplicate_names(graph_manager, monkeypatch):
+    sent = []
+    async def write(tx_function, rows):
+        sent.append(rows)
+        return {}
+    monkeypatch.setattr(graph_manager, "_write", write)
+    
+    await graph_manager.bulk_create_concepts(["a", "b", "a"])
+    assert sent == [[{"name": "a"}, {"name": "b"}]]
+
+# Relationship types
+
+def test_relationship_query_quotes_valid_types():
+    query = _relationship_query(Q_CREATE_RELATIONSHIP, "RELATES_TO")
+    assert "[r:`RELATES_TO`]" in query
+    assert "{id: $source_id}" in query
+
+@pytest.mark.parametrize("relationship_type", [
+    "",
+    "RELATES TO",
+    "1ABOUT",
+    "ABOUT`]->(target) DETACH DELETE target //",
+    "ABOUT}",
+    "ÄBOUT",
+])
+def test_relationship_query_rejects_unsafe_types(relationship_type):
+    with pytest.raises(ValueError, match="Invalid relationship type"):
+        _relationship_query(Q_CREATE_RELATIONSHIP, relationship_type)
+
+async def test_invalid_relationship_type_runs_nothing(graph_manager):
+    tx = RecordingTransaction()
+    with pytest.raises(ValueError):
+        await graph_manager._create_relationship_tx(tx, "n1", "c1", "ABOUT`]-()", {})
+    with pytest.raises(ValueError):
+        await graph_manager._bulk_create_relationships_tx(tx, "ABOUT;", [{"source": "n1", "target": "c1", "properties": {}}])
+    assert tx.runs == []
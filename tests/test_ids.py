@@ -0,0 +1,39 @@
+"""
+Tests for time-ordered identifiers
+"""
+import time
+import uuid
+
+from backend.core.ids import _uuid7, new_id
+
+def _timestamp_ms(value: uuid.UUID) -> int:
+    """Unix ms timestamp from the top 48 bits of a UUIDv7"""
+    return value.int >> 80
+
+def test_uuid7_version_and_variant():
+    for _ in range(100):
+        value = _uuid7()
+        assert value.version == 7
+        assert value.variant == uuid.RFC_4122
+
+def test_uuid7_embeds_current_time():
+    before = time.time_ns() // 1_000_000
+    value = _uuid7()
+    after = time.time_ns() // 1_000_000
+    assert before <= _timestamp_ms(value) <= after
+
+def test_uuid7_orders_by_creation_time():
+    values = []
+    for _ in range(5):
+        values.append(_uuid7())
+        # Step into the next millisecond; IDs within one millisecond are random
+        time.sleep(0.002)
+    assert values == sorted(values)
+    assert [str(v) for v in values] == sorted(str(v) for v in values)
+
+def test_uuid7_random_bits_differ():
+    assert len({_uuid7() for _ in range(1000)}) == 1000
+
+def test_new_id_is_a_uuid7_string():
+    value = uuid.UUID(new_id())
+    assert value.version == 7
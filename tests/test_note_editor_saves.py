@@ -0,0 +1,160 @@
+"""
+Tests for the note editor's save queue, driven without a display
+"""
+import asyncio
+from concurrent.futures import Future
+
+import pytest
+
+from frontend.views.note_editor import NoteEditor
+
+class FakeText:
+    """Stands in for the editor's text widget"""
+    
+    def __init__(self):
+        self.text = ""
+        
+    def get(self, start, end):
+        return self.text
+        
+    def delete(self, start, end):
+        self.text = ""
+        
+    def insert(self, index, text):
+        self.text = text
+
+class FakeAPIClient:
+    """Records saves and answers them with the next scripted result"""
+    
+    def __init__(self):
+        self.calls = []
+        self.results = []
+        
+    async def create_note(self, content):
+        self.calls.append(("create", None, content))
+        return self.results.pop(0)
+        
+    async def update_note(self, note_id, content):
+        self.calls.append(("update", note_id, content))
+        return self.results.pop(0)
+
+class ManualRuntime:
+    """Holds submitted saves until the test finishes them, in order"""
+    
+    def __init__(self):
+        self.pending = []
+        
+    def submit_ui(self, widget, coro, callback):
+        self.pending.append((coro, callback))
+
+@pytest.fixture
+def editor():
+    # Only the state the save path touches; no Tk root is needed
+    editor = NoteEditor.__new__(NoteEditor)
+    editor.api_client = FakeAPIClient()
+    editor.runtime = ManualRuntime()
+    editor.text_editor = FakeText()
+    editor.ai_response = None
+    editor.current_note = None
+    editor._saved_hash = None
+    editor._autosave_job = None
+    editor._saving = False
+    editor._queued_saves = []
+    editor._generation = 0
+    editor._content_cache = ""
+    editor._content_dirty = True
+    editor.toasts = []
+    editor._toast = lambda text, color, duration_ms=0: editor.toasts.append((text, color))
+    return editor
+
+def type_text(editor, text):
+    editor.text_editor.text = text
+    editor._content_dirty = True
+
+def finish_save(editor, result):
+    """Complete the oldest save in flight with the given backend result"""
+    coro, callback = editor.runtime.pending.pop(0)
+    editor.api_client.results.append(result)
+    future = Future()
+    future.set_result(asyncio.run(coro))
+    callback(future)
+
+def test_edits_during_create_update_the_created_note(editor):
+    type_text(editor, "draft")
+    editor._save_note(notify=False)
+    type_text(editor, "draft two")
+    editor._save_note(notify=False)
+    type_text(editor, "draft three")
+    editor._save_note()
+    # Only the create is in flight; the later saves collapse into one
+    assert len(editor.runtime.pending) == 1
+    assert len(editor._queued_saves) == 1
+    
+    finish_save(editor, {"id": "n1", "content": "draft"})
+    finish_save(editor, {"id": "n1", "content": "draft three"})
+    
+    assert editor.api_client.calls == [("create", None, "draft"), ("update", "n1", "draft three")]
+    assert editor.current_note == {"id": "n1", "content": "draft three"}
+    # The merged save kept the manual save's notification
+    assert editor.toasts == [("Note updated", "green")]
+
+def test_queued_save_of_the_saved_content_is_skipped(editor):
+    type_text(editor, "draft")
+    editor._save_note(notify=False)
+    # Edited and then reverted while the create is in flight
+    type_text(editor, "draft x")
+    editor._save_note(notify=False)
+    type_text(editor, "draft")
+    editor._save_note(notify=False)
+    
+    finish_save(editor, {"id": "n1", "content": "draft"})
+    assert editor.runtime.pending == []
+    assert editor.api_client.calls == [("create", None, "draft")]
+
+def test_unchanged_note_is_not_saved(editor):
+    editor.load_note({"id": "n1", "content": "saved"})
+    editor._save_note()
+    assert editor.runtime.pending == []
+
+def test_save_for_a_previous_note_keeps_its_target(editor):
+    editor.load_note({"id": "n1", "content": "one"})
+    type_text(editor, "one edited")
+    editor._save_note(notify=False)
+    # Switching notes while the save is in flight starts a new generation
+    editor.load_note({"id": "n2", "content": "two"})
+    type_text(editor, "two edited")
+    editor._save_note(notify=False)
+    
+    finish_save(editor, {"id": "n1", "content": "one edited"})
+    # The late result doesn't replace the note now in the editor
+    assert editor.current_note == {"id": "n2", "content": "two"}
+    finish_save(editor, {"id": "n2", "content": "two edited"})
+    
+    assert editor.api_client.calls == [("update", "n1", "one edited"), ("update", "n2", "two edited")]
+    assert editor.current_note == {"id": "n2", "content": "two edited"}
+
+def test_failed_save_keeps_the_note_and_retries_it(editor):
+    editor.load_note({"id": "n1", "content": "one"})
+    type_text(editor, "one edited")
+    editor._save_note(notify=False)
+    finish_save(editor, {"error": "backend down"})
+    
+    assert editor.current_note == {"id": "n1", "content": "one"}
+    assert editor.toasts == [("Failed to update note: backend down", "red")]
+    
+    # The hash wasn't advanced, so the same content is saved again
+    editor._save_note(notify=False)
+    finish_save(editor, {"id": "n1", "content": "one edited"})
+    assert editor.api_client.calls == [("update", "n1", "one edited")] * 2
+    assert editor.current_note == {"id": "n1", "content": "one edited"}
+
+def test_failed_create_does_not_retarget_queued_saves(editor):
+    type_text(editor, "draft")
+    editor._save_note(notify=False)
+    type_text(editor, "draft two")
+    editor._save_note(notify=False)
+    
+    finish_save(editor, {"error": "backend down"})
+    finish_save(editor, {"id": "n1", "content": "draft two"})
+    assert editor.api_client.calls == [("create", None, "draft"), ("create", None, "draft two")]
+    assert editor.current_note == {"id": "n1", "content": "draft two"}
@@ -0,0 +1,130 @@
+"""
+Tests for note processing, with the AI and graph replaced by recording fakes
+"""
+import asyncio
+
+import pytest
+
+from backend.ai.note_processor import ExtractionError, NoteProcessor
+
+EXTRACTION = '{"concepts": ["Being"], "categories": [{"name": "Ontology", "confidence": 0.9}], "relationships": []}'
+
+class ScriptedAIManager:
+    """Answers queries with scripted responses, optionally held until released"""
+    
+    def __init__(self, *responses):
+        self.responses = list(responses) or [EXTRACTION]
+        self.prompts = []
+        self.release = asyncio.Event()
+        self.release.set()
+        
+    async def query(self, prompt, structured_output=False):
+        self.prompts.append(prompt)
+        await self.release.wait()
+        response = self.responses[min(len(self.prompts), len(self.responses)) - 1]
+        if isinstance(response, dict):
+            return response
+        return {"response": response}
+
+class RecordingGraphManager:
+    """Records note writes and hands out concept ids"""
+    
+    def __init__(self):
+        self.notes = []
+        
+    async def bulk_create_concepts(self, names):
+        return {name: f"id-{name}" for name in names}
+        
+    async def create_note_with_links(self, content, metadata, links):
+        self.notes.append((content, metadata, links))
+        return {"id": f"note-{len(self.notes)}", "content": content}
+        
+    async def bulk_assign_categories(self, rows):
+        pass
+
+@pytest.fixture(autouse=True)
+def clear_extraction_cache():
+    # Extraction results are memoized per process by content
+    NoteProcessor._extract_concepts_and_categories.cache_clear()
+    yield
+    NoteProcessor._extract_concepts_and_categories.cache_clear()
+
+# Single-flight
+
+async def test_concurrent_identical_notes_are_processed_once():
+    ai_manager = ScriptedAIManager()
+    ai_manager.release.clear()
+    graph_manager = RecordingGraphManager()
+    processor = NoteProcessor(ai_manager, graph_manager)
+    
+    calls = [asyncio.create_task(processor.process_note("same", {"tags": ["x"]})) for _ in range(3)]
+    await asyncio.sleep(0)
+    ai_manager.release.set()
+    results = await asyncio.gather(*calls)
+    
+    assert len(ai_manager.prompts) == 1
+    assert len(graph_manager.notes) == 1
+    assert results[0] == results[1] == results[2]
+    assert results[0]["concepts"] == ["Being"]
+    assert processor._inflight == {}
+
+async def test_notes_with_different_metadata_are_processed_separately():
+    graph_manager = RecordingGraphManager()
+    processor = NoteProcessor(ScriptedAIManager(), graph_manager)
+    await asyncio.gather(processor.process_note("same", {"tags": ["x"]}), processor.process_note("same", {"tags": ["y"]}))
+    assert [metadata for _, metadata, _ in graph_manager.notes] == [{"tags": ["x"]}, {"tags": ["y"]}]
+
+async def test_cancelled_caller_does_not_cancel_shared_processing():
+    ai_manager = ScriptedAIManager()
+    ai_manager.release.clear()
+    graph_manager = RecordingGraphManager()
+    processor = NoteProcessor(ai_manager, graph_manager)
+    
+    first = asyncio.create_task(processor.process_note("same"))
+    second = asyncio.create_task(processor.process_note("same"))
+    await asyncio.sleep(0)
+    first.cancel()
+    ai_manager.release.set()
+    
+    result = await second
+    assert result["note"]["content"] == "same"
+    assert first.cancelled()
+    assert len(graph_manager.notes) == 1
+
+# Extraction validation
+
+async def test_invalid_extraction_is_retried_with_the_errors():
+    ai_manager = ScriptedAIManager('{"concepts": "not a list"}', EXTRACTION)
+    processor = NoteProcessor(ai_manager, RecordingGraphManager())
+    
+    result = await processor.process_note("being")
+    assert result["concepts"] == ["Being"]
+    assert len(ai_manager.prompts) == 2
+    assert "did not match the required format" in ai_manager.prompts[1]
+    assert ai_manager.prompts[1] != ai_manager.prompts[0]
+
+async def test_extraction_fails_after_retries_without_writing():
+    ai_manager = ScriptedAIManager("not json")
+    graph_manager = RecordingGraphManager()
+    processor = NoteProcessor(ai_manager, graph_manager)
+    
+    with pytest.raises(ExtractionError, match="Invalid extraction response"):
+        await processor.process_note("being")
+    assert len(ai_manager.prompts) == 3
+    assert graph_manager.notes == []
+
+async def test_ai_error_is_not_retried():
+    ai_manager = ScriptedAIManager({"error": "provider down"})
+    processor = NoteProcessor(ai_manager, RecordingGraphManager())
+    
+    with pytest.raises(ExtractionError, match="provider down"):
+        await processor.process_note("being")
+    assert len(ai_manager.prompts) == 1
+
+async def test_unknown_categories_are_dropped():
+    ai_manager = ScriptedAIManager(
+        '{"concepts": [], "categories": [{"name": "Ontology", "confidence": 0.5}, {"name": "Astrology", "confidence": 1}]}'
+    )
+    processor = NoteProcessor(ai_manager, RecordingGraphManager())
+    result = await processor.process_note("being")
+    assert result["categories"] == [{"name": "Ontology", "confidence": 0.5}]
@@ -0,0 +1,58 @@
+"""
+Tests for the frontend TTL cache
+"""
+import pytest
+
+from frontend.services import ttl_cache
+from frontend.services.ttl_cache import TTLCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for the cache's time.monotonic"""
+    class Clock:
+        now = 100.0
+        
+        def monotonic(self):
+            return self.now
+            
+    clock = Clock()
+    monkeypatch.setattr(ttl_cache.time, "monotonic", clock.monotonic)
+    return clock
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(ttl=5)
+    cache.set("a", 1)
+    clock.now += 4.9
+    assert cache.get("a") == 1
+    clock.now += 0.1
+    assert cache.get("a") is None
+    assert "a" not in cache._entries
+
+def test_setting_again_restarts_the_ttl(clock):
+    cache = TTLCache(ttl=5)
+    cache.set("a", 1)
+    clock.now += 4
+    cache.set("a", 2)
+    clock.now += 4
+    assert cache.get("a") == 2
+
+def test_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # Reading "a" makes "b" the least recently used
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+def test_pop_and_clear():
+    cache = TTLCache()
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.pop("a")
+    cache.pop("missing")
+    assert cache.get("a") is None
+    cache.clear()
+    assert cache.get("b") is None